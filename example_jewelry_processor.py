@@ -13,7 +13,7 @@ from pathlib import Path
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent / 'src'))
 
-from src.shopify_sheet_generator import JewelryCSVProcessor
+from src.clients import get_processor
 from src.config import GEMINI_API_KEY
 
 def main():
@@ -31,8 +31,8 @@ def main():
     
     # Check API key
     if not GEMINI_API_KEY:
-        print("Error: Gemini API key not found in config.py")
-        print("Please set your GEMINI_API_KEY in src/config.py")
+        print("Error: Gemini API key not found")
+        print("Please set the GEMINI_API_KEY environment variable")
         return
     
     print("="*60)
@@ -44,18 +44,25 @@ def main():
     print()
     
     try:
-        # Initialize the processor
-        processor = JewelryCSVProcessor(GEMINI_API_KEY)
+        # Get the shared processor, which reuses Gemini analyses from previous runs
+        # and cleans up its temporary files when the interpreter exits
+        processor = get_processor()
+        response_cache = processor.response_cache
         
         # Process the CSV file
         print("Starting processing...")
-        processor.process_csv_file(input_csv, output_csv)
+        # Resume a previous run by skipping SKUs that are already in the output file
+        done = processor.load_processed_skus(output_csv)
+        if done:
+            print(f"Resuming: skipping {len(done)} already-processed rows.")
+        processor.process_csv_file(input_csv, output_csv, skip_skus=done, append=bool(done))
         
         print()
         print("="*60)
         print("PROCESSING COMPLETED SUCCESSFULLY!")
         print("="*60)
         print(f"✅ Shopify CSV created: {output_csv}")
+        print(f"🗄️  Gemini cache hits: {response_cache.hits}, misses: {response_cache.misses}")
         print()
         print("Next steps:")
         print("1. Review the generated CSV file")
@@ -66,13 +73,6 @@ def main():
     except Exception as e:
         print(f"❌ Error during processing: {e}")
         print("Please check the logs above for more details.")
-        
-    finally:
-        # Clean up temporary files
-        try:
-            processor.cleanup()
-        except:
-            pass
 
 if __name__ == "__main__":
     main()
@@ -6,13 +6,16 @@ This script demonstrates different ways to use the ShopifyImageUploader class
 to upload product images and videos to your Shopify store.
 """
 
+import asyncio
 import os
+from collections import defaultdict
 from pathlib import Path
-from src.shopify_image_uploader import ShopifyImageUploader
-from src.config import SHOPIFY_API_KEY, SHOPIFY_SECRET_KEY, SHOPIFY_STORE_URL
+from src.shopify_image_uploader import ShopifyImageUploader, extract_sku_from_filename
+from src.config import SHOPIFY_API_KEY, SHOPIFY_SECRET_KEY, SHOPIFY_STORE_URL, assert_shopify_configured
 
 def example_basic_upload():
     """Basic example of uploading media files (images and videos) from a folder"""
+    assert_shopify_configured()
     
     # Initialize the uploader
     uploader = ShopifyImageUploader(
@@ -30,19 +33,17 @@ def example_basic_upload():
         print(f"Created sample folder: {media_folder}")
         print("Add your product media files to this folder with filenames like:")
         print("  Images:")
-        print("    - product_123_main.jpg")
-        print("    - 456_variant_01.png")
-        print("    - SKU_789_photo.jpeg")
+        print("    - NK-00001-0825-01.jpg")
+        print("    - NK-00001-0825-02.png")
         print("  Videos:")
-        print("    - product_123_demo.mp4")
-        print("    - 456_showcase.mp4")
-        print("    - SKU_789_video.mp4")
+        print("    - NK-00001-0825-demo.mp4")
         return
     
-    # Process all media files in the folder
+    # Process all media files in the folder concurrently; the uploader resolves SKUs in bulk
+    # and uploads each product's files together
     print(f"Processing media files in: {media_folder}")
-    results = uploader.process_folder(media_folder, dry_run=True)  # Set dry_run=False to actually upload
-    
+    results = asyncio.run(uploader.aprocess_folder(media_folder, dry_run=True))  # Set dry_run=False to actually upload
+
     # Print results
     print(f"\nResults:")
     print(f"  Total files: {results['total_files']}")
@@ -53,6 +54,7 @@ def example_basic_upload():
 
 def example_single_media_upload():
     """Example of uploading a single media file to a specific product"""
+    assert_shopify_configured()
     
     uploader = ShopifyImageUploader(
         shop_url=SHOPIFY_STORE_URL,
@@ -97,6 +99,7 @@ def example_single_media_upload():
 
 def example_filename_patterns():
     """Example showing different filename patterns that work"""
+    assert_shopify_configured()
     
     uploader = ShopifyImageUploader(
         shop_url=SHOPIFY_STORE_URL,
@@ -106,23 +109,25 @@ def example_filename_patterns():
     
     # Test different filename patterns for both images and videos
     test_filenames = [
-        "product_123_main.jpg",      # Pattern: product_ID (image)
-        "456_variant_01.png",        # Pattern: ID_ (image)
-        "SKU_789_photo.jpeg",        # Pattern: SKU_ID (image)
-        "ID_999_image.jpg",          # Pattern: ID_ID (image)
-        "1234567890.png",            # Pattern: long number (image)
-        "item-555-front.jpg",        # Pattern: -ID- (image)
-        "photo_product_888.jpg",     # Pattern: _ID (image)
-        "product_123_demo.mp4",      # Pattern: product_ID (video)
-        "456_showcase.mp4",          # Pattern: ID_ (video)
-        "SKU_789_video.mp4",         # Pattern: SKU_ID (video)
-        "ID_999_promo.mp4",          # Pattern: ID_ID (video)
+        "NK-00001-0825-01.jpg",      # Pattern: SKU-NN (image)
+        "NK-00001-0825-02.png",      # Same SKU, another angle (image)
+        "NK-00001-0825.jpeg",        # Pattern: bare SKU (image)
+        "ER-12345-0825-01.webp",     # Different product (image)
+        "NK-00001-0825-demo.mp4",    # Pattern: SKU-suffix (video)
+        "ER-12345-0825.mp4",         # Pattern: bare SKU (video)
+        "product_123_main.jpg",      # No SKU prefix, skipped
     ]
     
-    print("Testing filename patterns:")
+    # Files sharing a SKU resolve to the same product, so look each SKU up once
+    sku_to_files = defaultdict(list)
     for filename in test_filenames:
-        product_id = uploader.extract_product_id_from_filename(filename)
-        print(f"  {filename:<25} -> Product ID: {product_id}")
+        sku_to_files[extract_sku_from_filename(filename)].append(filename)
+
+    print("Testing filename patterns:")
+    for sku, files in sku_to_files.items():
+        product_id = uploader.extract_product_id_from_filename(files[0]) if sku else None
+        for filename in files:
+            print(f"  {filename:<25} -> Product ID: {product_id}")
 
 def main():
     """Run examples"""
@@ -142,7 +147,7 @@ def main():
     except Exception as e:
         print(f"Error running examples: {e}")
         print("\nMake sure to:")
-        print("1. Update SHOPIFY_STORE_URL in src/config.py")
+        print("1. Set the SHOPIFY_STORE_URL environment variable")
         print("2. Verify your API credentials")
         print("3. Install required packages: pip install -r requirements.txt")
 
@@ -7,14 +7,17 @@ that fetches product_id from SKU using Shopify API
 import sys
 from pathlib import Path
 
+from tqdm import tqdm
+
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent / 'src'))
 
-from shopify_image_uploader import ShopifyImageUploader
-from config import SHOPIFY_API_KEY, SHOPIFY_SECRET_KEY, SHOPIFY_STORE_URL
+from shopify_image_uploader import ShopifyImageUploader, extract_sku_from_filename
+from config import SHOPIFY_API_KEY, SHOPIFY_SECRET_KEY, SHOPIFY_STORE_URL, assert_shopify_configured
 
 def example_sku_to_product_id():
     """Example of how the updated function works"""
+    assert_shopify_configured()
     
     print("Shopify SKU to Product ID Lookup Example")
     print("=" * 50)
@@ -61,6 +64,7 @@ def example_sku_to_product_id():
 
 def example_batch_processing():
     """Example of processing multiple files"""
+    assert_shopify_configured()
     
     print("\n" + "=" * 50)
     print("BATCH PROCESSING EXAMPLE")
@@ -92,16 +96,23 @@ def example_batch_processing():
         'not_found': []
     }
     
-    for filename in filenames:
-        print(f"\n🔍 Processing: {filename}")
-        
-        product_id = uploader.extract_product_id_from_filename(filename)
+    # Sibling files share a SKU, so resolve each unique SKU once
+    skus = {extract_sku_from_filename(filename) for filename in filenames}
+    skus.discard(None)
+
+    # Resolve everything with as few OR'd GraphQL queries as possible; SKUs resolved
+    # on an earlier run come from the uploader's on-disk cache instead of the API
+    sku_to_product_id = uploader.bulk_resolve_skus(skus)
+
+    # Successes are listed in the summary, so only misses are reported as they happen
+    # (set TQDM_DISABLE=1 to hide the progress bar)
+    for filename in tqdm(filenames, desc="Resolving SKUs", mininterval=0.5):
+        product_id = sku_to_product_id.get(extract_sku_from_filename(filename))
         
         if product_id:
-            print(f"  ✅ Found product ID: {product_id}")
             results['found'].append((filename, product_id))
         else:
-            print(f"  ❌ No product found")
+            tqdm.write(f"  ❌ No product found for {filename}")
             results['not_found'].append(filename)
     
     # Summary
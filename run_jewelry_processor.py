@@ -39,11 +39,24 @@ def main():
     output_file = input(f"Enter output file name (default: {default_output}): ").strip()
     if not output_file:
         output_file = default_output
+
+    # Get chunk size
+    default_chunk_size = 1000
+    chunk_size_input = input(f"Enter rows to process per chunk (default: {default_chunk_size}): ").strip()
+    try:
+        chunk_size = int(chunk_size_input) if chunk_size_input else default_chunk_size
+    except ValueError:
+        print(f"❌ Error: Invalid chunk size '{chunk_size_input}'!")
+        return
+    if chunk_size <= 0:
+        print(f"❌ Error: Chunk size must be positive!")
+        return
     
     print()
     print("Configuration:")
     print(f"  Input file: {input_file}")
     print(f"  Output file: {output_file}")
+    print(f"  Chunk size: {chunk_size}")
     print()
     
     # Confirm before processing
@@ -58,7 +71,7 @@ def main():
     
     try:
         # Import and run the processor
-        from src.shopify_sheet_generator import JewelryCSVProcessor
+        from src.clients import get_processor
         try:
             from src.config import GEMINI_API_KEY
         except ImportError:
@@ -67,18 +80,25 @@ def main():
         
         if not GEMINI_API_KEY:
             print("❌ Error: Gemini API key not found!")
-            print("Please set GEMINI_API_KEY in src/config.py")
+            print("Please set the GEMINI_API_KEY environment variable")
             return
         
-        # Initialize and run processor
-        processor = JewelryCSVProcessor(GEMINI_API_KEY)
-        processor.process_csv_file(input_file, output_file)
+        # Get the shared processor, which reuses Gemini analyses from previous runs
+        # and cleans up its temporary files when the interpreter exits
+        processor = get_processor()
+        response_cache = processor.response_cache
+        # Resume a previous run by skipping SKUs that are already in the output file
+        done = processor.load_processed_skus(output_file)
+        if done:
+            print(f"Resuming: skipping {len(done)} already-processed rows.")
+        processor.process_csv_file(input_file, output_file, chunk_size=chunk_size, skip_skus=done, append=bool(done))
         
         print()
         print("="*60)
         print("✅ PROCESSING COMPLETED SUCCESSFULLY!")
         print("="*60)
         print(f"Output file created: {output_file}")
+        print(f"Gemini cache hits: {response_cache.hits}, misses: {response_cache.misses}")
         print()
         print("Next steps:")
         print("1. Review the generated CSV file")
@@ -89,18 +109,11 @@ def main():
         print(f"❌ Error during processing: {e}")
         print()
         print("Troubleshooting tips:")
-        print("1. Check your Gemini API key in src/config.py")
+        print("1. Check your GEMINI_API_KEY environment variable")
         print("2. Ensure your CSV has the required columns")
         print("3. Verify Google Drive links are publicly accessible")
         print("4. Run: pip install -r requirements.txt")
-    
-    finally:
-        # Cleanup
-        try:
-            if 'processor' in locals():
-                processor.cleanup()
-        except:
-            pass
+
 
 if __name__ == "__main__":
     main()
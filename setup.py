@@ -75,6 +75,11 @@ def test_imports():
 def create_sample_images():
     """Create sample images for testing"""
     print("Creating sample images...")
+
+    sample_path = Path("input_images/sample_test.png")
+    if sample_path.exists():
+        print(f"✓ Sample image already exists: {sample_path}")
+        return True
     
     try:
         from PIL import Image, ImageDraw
@@ -89,7 +94,6 @@ def create_sample_images():
         draw.text((160, 250), "Test Image", fill='black')
         
         # Save the test image
-        sample_path = Path("input_images/sample_test.png")
         img.save(sample_path)
         print(f"✓ Created sample image: {sample_path}")
         
@@ -108,6 +112,12 @@ def main():
     
     success = True
     
+    # The quick checks run first, so their output isn't interleaved with pip's
+    create_directories()
+    api_key_set = check_api_key()
+
+    print()
+
     # Install requirements
     if not install_requirements():
         success = False
@@ -120,19 +130,9 @@ def main():
     
     print()
     
-    # Create directories
-    create_directories()
-    
-    print()
-    
     # Create sample images
     create_sample_images()
     
-    print()
-    
-    # Check API key
-    api_key_set = check_api_key()
-    
     print()
     print("=" * 50)
     
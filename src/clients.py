@@ -0,0 +1,51 @@
+"""
+Shared API clients
+
+Clients are created on first use and reused for the rest of the process,
+so every caller shares the same connection pool.
+"""
+
+import atexit
+import functools
+
+import httpx
+from google import genai
+from google.genai import types
+
+# Try to import from src directory, fallback to current directory
+try:
+    from src.config import GEMINI_API_KEY
+except ImportError:
+    from config import GEMINI_API_KEY
+
+
+@functools.lru_cache(maxsize=1)
+def gemini_client() -> genai.Client:
+    """Return the process-wide Gemini client, backed by a persistent HTTP/2 connection pool"""
+    http_options = types.HttpOptions(
+        client_args={
+            'http2': True,
+            'limits': httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=300),
+        }
+    )
+    return genai.Client(api_key=GEMINI_API_KEY, http_options=http_options)
+
+
+@functools.lru_cache(maxsize=1)
+def get_processor():
+    """
+    Return the process-wide JewelryCSVProcessor
+
+    The processor is cleaned up once when the interpreter exits rather than after
+    each run, so repeated runs in one process reuse its client and response cache.
+    """
+    # Imported here so modules that only need the Gemini client don't pull in pandas
+    try:
+        from src.shopify_sheet_generator import DEFAULT_IMAGE_CACHE_DIR, GeminiResponseCache, JewelryCSVProcessor
+    except ImportError:
+        from shopify_sheet_generator import DEFAULT_IMAGE_CACHE_DIR, GeminiResponseCache, JewelryCSVProcessor
+
+    processor = JewelryCSVProcessor(GEMINI_API_KEY, response_cache=GeminiResponseCache(), client=gemini_client(),
+                                    image_cache_dir=DEFAULT_IMAGE_CACHE_DIR)
+    atexit.register(processor.cleanup)
+    return processor
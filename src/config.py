@@ -0,0 +1,37 @@
+"""
+Configuration
+
+Credentials are read from the environment so they never need to be committed.
+Set them in your shell before running any of the scripts, for example:
+    export GEMINI_API_KEY="your_api_key_here"
+    export SHOPIFY_STORE_URL="your-store.myshopify.com"
+    export ADMIN_API_ACCESS_TOKEN="shpat_..."
+"""
+
+import os
+
+# Google Gemini
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+
+# Shopify
+SHOPIFY_STORE_URL = os.environ.get("SHOPIFY_STORE_URL", "your-store.myshopify.com")
+SHOPIFY_API_KEY = os.environ.get("SHOPIFY_API_KEY", "")
+SHOPIFY_SECRET_KEY = os.environ.get("SHOPIFY_SECRET_KEY", "")
+ADMIN_API_ACCESS_TOKEN = os.environ.get("ADMIN_API_ACCESS_TOKEN", "")
+
+# Values that mean the store URL was never configured
+PLACEHOLDER_VALUES = {"your-store.myshopify.com", "", None}
+
+# Supported image formats
+SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp'}
+
+# Logging
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def assert_shopify_configured():
+    """Fail fast instead of waiting on a DNS/connection timeout for a placeholder store URL"""
+    if SHOPIFY_STORE_URL in PLACEHOLDER_VALUES:
+        raise RuntimeError("SHOPIFY_STORE_URL not configured; set the SHOPIFY_STORE_URL environment variable")
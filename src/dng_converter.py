@@ -6,13 +6,101 @@ to compressed PNG format using rawpy and PIL libraries.
 """
 
 import os
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 
+import numpy as np
 import rawpy
 from PIL import Image
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
-from image_helper import load_image, convert_to_square
+from image_helper import convert_to_square, log_pillow_build
+
+# TurboJPEG is optional; when installed it encodes JPEG output straight from the NumPy array
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_444
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    _turbo_jpeg = None
+
+# JPEG quality used when a lossless PNG is not required
+JPEG_QUALITY = 92
+
+# OpenCV is optional; when installed it resizes the demosaiced array directly with SIMD kernels
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+@lru_cache(maxsize=None)
+def _postprocess_params(half_size: bool) -> rawpy.Params:
+    """
+    Build the libraw postprocessing parameters once per worker process.
+
+    Args:
+        half_size (bool): Whether to demosaic at half resolution
+
+    Returns:
+        rawpy.Params: Parameters shared by every DNG in a batch
+    """
+    return rawpy.Params(
+        gamma=(2.2, 4.5),
+        use_camera_wb=True,
+        half_size=half_size,
+        no_auto_bright=False,
+        output_color=rawpy.ColorSpace.sRGB,
+        output_bps=8
+    )
+
+
+def _fadvise(file, advice: str) -> None:
+    """
+    Pass an access-pattern hint for an open file to the kernel, where supported.
+
+    Args:
+        file: Open file object
+        advice (str): Name of the os.POSIX_FADV_* constant
+    """
+    if hasattr(os, 'posix_fadvise') and hasattr(os, advice):
+        os.posix_fadvise(file.fileno(), 0, 0, getattr(os, advice))
+
+
+def _fits_half_size(sizes, resize: Tuple[int, int]) -> bool:
+    """
+    Check whether a half-size demosaic is still at least as large as the resize target.
+
+    Args:
+        sizes: rawpy ImageSizes of the opened raw file
+        resize (tuple): Target size as (width, height)
+
+    Returns:
+        bool: True if postprocess(half_size=True) needs no upscaling to reach resize
+    """
+    width, height = sizes.width, sizes.height
+    # Flips 5 and 6 rotate by 90 degrees, swapping the output dimensions
+    if sizes.flip in (5, 6):
+        width, height = height, width
+    return resize[0] * 2 <= width and resize[1] * 2 <= height
+
+
+def save_jpeg(image: Image.Image, output_path: str, quality: int = JPEG_QUALITY) -> None:
+    """
+    Save an RGB image as a JPEG with full-resolution chroma.
+
+    Args:
+        image (Image.Image): Image to save
+        output_path (str): Path for the output JPEG file
+        quality (int): JPEG quality (0-100)
+    """
+    if _turbo_jpeg is not None:
+        # TurboJPEG defaults to BGR channel order
+        encoded = _turbo_jpeg.encode(np.asarray(image), quality=quality, pixel_format=TJPF_RGB,
+                                     jpeg_subsample=TJSAMP_444)
+        with open(output_path, 'wb') as f:
+            f.write(encoded)
+    else:
+        image.save(output_path, format='JPEG', quality=quality, subsampling=0, optimize=False)
 
 
 def convert_dng_to_png(
@@ -20,8 +108,10 @@ def convert_dng_to_png(
     output_path: Optional[str] = None,
     compression_level: int = 8,
     resize: Optional[Tuple[int, int]] = None,
-    gamma: float = 2.2
-) -> str:
+    gamma: float = 2.2,
+    output_format: str = 'PNG',
+    return_array: bool = False
+) -> Union[str, np.ndarray]:
     """
     Convert a DNG file to a compressed PNG file.
 
@@ -33,13 +123,17 @@ def convert_dng_to_png(
         quality (int): Image quality for processing (0-100)
         resize (tuple, optional): Target size as (width, height) for resizing
         gamma (float): Gamma correction value
+        output_format (str): 'PNG' for lossless output, or 'JPEG' for a much faster
+                             encode and smaller upload when lossless is not needed
+        return_array (bool): If True, return the decoded RGB NumPy array instead of
+                             writing a file, for callers that keep processing it
 
     Returns:
-        str: Path to the created PNG file
+        str: Path to the created PNG file, or the NumPy array if return_array is True
 
     Raises:
         FileNotFoundError: If the input DNG file doesn't exist
-        ValueError: If compression_level is not between 0-9
+        ValueError: If compression_level is not between 0-9 or output_format is unsupported
         Exception: For other processing errors
     """
     
@@ -50,40 +144,63 @@ def convert_dng_to_png(
     if not (0 <= compression_level <= 9):
         raise ValueError("Compression level must be between 0 and 9")
 
+    output_format = output_format.upper()
+    if output_format not in ('PNG', 'JPEG'):
+        raise ValueError("Output format must be 'PNG' or 'JPEG'")
     
     # Generate output path if not provided
     if output_path is None:
         base_name = os.path.splitext(os.path.basename(dng_path))[0]
         output_dir = os.path.dirname(dng_path)
-        output_path = os.path.join(output_dir, f"{base_name}.png")
+        extension = 'png' if output_format == 'PNG' else 'jpg'
+        output_path = os.path.join(output_dir, f"{base_name}.{extension}")
     
     try:
         # Read and process the DNG file
-        with rawpy.imread(dng_path) as raw:
-            # Process the raw image with specified parameters
-            rgb_array = raw.postprocess(
-                gamma=(2.2, 4.5),
-                use_camera_wb=True,
-                half_size=False,
-                no_auto_bright=False,
-                output_color=rawpy.ColorSpace.sRGB,
-                output_bps=8
-            )
-        
+        with open(dng_path, 'rb') as dng_file:
+            _fadvise(dng_file, 'POSIX_FADV_SEQUENTIAL')
+            with rawpy.imread(dng_file) as raw:
+                # When the target is at most half the sensor size, let libraw average
+                # Bayer quads instead of demosaicing at full resolution and resizing after
+                half_size = bool(resize) and _fits_half_size(raw.sizes, resize)
+
+                # Process the raw image with specified parameters
+                rgb_array = raw.postprocess(params=_postprocess_params(half_size))
+
+            # Each DNG is read exactly once, so don't leave it occupying the page cache
+            _fadvise(dng_file, 'POSIX_FADV_DONTNEED')
+
+        # Resize if requested (only the remaining factor after a half-size demosaic)
+        height, width = rgb_array.shape[:2]
+        if resize and (width, height) != tuple(resize) and cv2 is not None:
+            # Area averaging is both cheaper and cleaner than Lanczos when shrinking
+            downscale = resize[0] <= width and resize[1] <= height
+            interpolation = cv2.INTER_AREA if downscale else cv2.INTER_LANCZOS4
+            rgb_array = cv2.resize(rgb_array, tuple(resize), interpolation=interpolation)
+
+        height, width = rgb_array.shape[:2]
+        if return_array and (not resize or (width, height) == tuple(resize)):
+            return rgb_array
+
         # Convert numpy array to PIL Image
         image = Image.fromarray(rgb_array)
-        
-        # Resize if requested
-        if resize:
+
+        if resize and image.size != tuple(resize):
             image = image.resize(resize, Image.Resampling.LANCZOS)
+
+        if return_array:
+            return np.asarray(image)
         
-        # Save as compressed PNG
-        image.save(
-            output_path,
-            format='PNG',
-            compress_level=compression_level,
-            optimize=True
-        )
+        if output_format == 'JPEG':
+            save_jpeg(image, output_path)
+        else:
+            # Save as compressed PNG
+            image.save(
+                output_path,
+                format='PNG',
+                compress_level=compression_level,
+                optimize=True
+            )
         
         print(f"Successfully converted {dng_path} to {output_path}")
         return output_path
@@ -92,18 +209,51 @@ def convert_dng_to_png(
         raise Exception(f"Error converting DNG to PNG: {str(e)}")
 
 
+def _convert_one(input_path: str, output_directory: str, kwargs: dict) -> str:
+    """
+    Convert one DNG file to a square PNG; module-level so it can run in a worker process.
+
+    Args:
+        input_path (str): Path to the input DNG file
+        output_directory (str): Directory for the output PNG file
+        kwargs (dict): Additional arguments passed to convert_dng_to_png
+
+    Returns:
+        str: Path to the created PNG file
+    """
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+
+    # Crop libraw's pixel array in place (a zero-copy view) and only wrap it in PIL to save
+    rgb_array = convert_dng_to_png(input_path, return_array=True, **kwargs)
+    output_image_square = Image.fromarray(convert_to_square(rgb_array, method='crop'))
+    if kwargs.get('output_format', 'PNG').upper() == 'JPEG':
+        final_output_path = os.path.join(output_directory, f"{base_name}.jpg")
+        save_jpeg(output_image_square, final_output_path)
+    else:
+        final_output_path = os.path.join(output_directory, f"{base_name}.png")
+        output_image_square.save(final_output_path)
+    return final_output_path
+
+
 def batch_convert_dng_to_png(
     input_directory: str,
     output_directory: Optional[str] = None,
+    max_workers: Optional[int] = None,
     **kwargs
 ) -> list:
     """
     Convert all DNG files in a directory to PNG format.
+
+    Files are converted in separate processes, since libraw demosaicing is
+    CPU-bound and holds the GIL.
     
     Args:
         input_directory (str): Directory containing DNG files
         output_directory (str, optional): Directory for output PNG files.
                                         If None, uses the same as input directory
+        max_workers (int, optional): Number of worker processes. Each worker holds a
+                                     full-resolution RGB array, so lower this if memory
+                                     is tight. Defaults to the CPU count.
         **kwargs: Additional arguments passed to convert_dng_to_png
     
     Returns:
@@ -123,7 +273,8 @@ def batch_convert_dng_to_png(
     os.makedirs(output_directory, exist_ok=True)
     
     converted_files = []
-    dng_files = [f for f in os.listdir(input_directory) if f.lower().endswith('.dng')]
+    with os.scandir(input_directory) as entries:
+        dng_files = [entry.name for entry in entries if entry.name.lower().endswith('.dng') and entry.is_file()]
     
     if not dng_files:
         print(f"No DNG files found in {input_directory}")
@@ -131,23 +282,20 @@ def batch_convert_dng_to_png(
     
     print(f"Found {len(dng_files)} DNG files to convert...")
     
-    for dng_file in dng_files:
-        try:
-            input_path = os.path.join(input_directory, dng_file)
-            base_name = os.path.splitext(dng_file)[0]
-            raw_output_path = os.path.join(output_directory, f"{base_name}_raw.png")
-            convert_dng_to_png(input_path, raw_output_path, **kwargs)
-
-            output_image = load_image(Path(raw_output_path))
-            output_image_square = convert_to_square(output_image, method='crop')
-            final_output_path = os.path.join(output_directory, f"{base_name}.png")
-            output_image_square.save(final_output_path)
-            os.remove(raw_output_path)
-            converted_files.append(final_output_path)
-            
-        except Exception as ex:
-            print(f"Failed to convert {dng_file}: {str(ex)}")
-            raise ex
+    max_workers = min(max_workers or os.cpu_count() or 1, len(dng_files))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_convert_one, os.path.join(input_directory, dng_file), output_directory, kwargs): dng_file
+            for dng_file in dng_files
+        }
+        for future in as_completed(futures):
+            try:
+                converted_files.append(future.result())
+            except Exception as ex:
+                print(f"Failed to convert {futures[future]}: {str(ex)}")
+                for pending in futures:
+                    pending.cancel()
+                raise ex
     
     print(f"Successfully converted {len(converted_files)} out of {len(dng_files)} files")
     return converted_files
@@ -163,6 +311,7 @@ if __name__ == "__main__":
     
     input_directory = sys.argv[1]
     output_directory = sys.argv[2] if len(sys.argv) > 2 else None
+    log_pillow_build()
     
     try:
         result = batch_convert_dng_to_png(input_directory, output_directory)
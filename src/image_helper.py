@@ -1,9 +1,12 @@
 import io
 from pathlib import Path
 import logging
+from importlib import metadata
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
+import numpy as np
+import PIL
 from PIL import Image
 
 from config import (
@@ -18,6 +21,21 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def log_pillow_build() -> None:
+    """
+    Log whether PIL comes from the Pillow-SIMD distribution; call once from a CLI entry point
+
+    Stock Pillow resizes several times slower than Pillow-SIMD, which installs the same
+    PIL package under a different distribution name.
+    """
+    try:
+        metadata.distribution('Pillow-SIMD')
+        build = 'Pillow-SIMD'
+    except metadata.PackageNotFoundError:
+        build = 'stock Pillow'
+    logger.debug(f"Using {build} {PIL.__version__}")
+
+
 def is_valid_image(file_path: Path) -> bool:
     """
     Check if file is a valid image
@@ -53,12 +71,80 @@ def load_image(image_path: Path) -> Optional[Image.Image]:
         raise e
 
 
-def convert_to_square(image: Image.Image, method: str = 'pad', background_color: tuple = (255, 255, 255)) -> Image.Image:
+def _pad_pixels(pixels: np.ndarray, background_color: tuple) -> np.ndarray:
+    """
+    Pad an RGB pixel array to a square, centered on a background color
+
+    Args:
+        pixels: RGB pixels of shape (height, width, 3)
+        background_color: RGB tuple for the padding
+
+    Returns:
+        Square RGB pixel array
+    """
+    height, width = pixels.shape[:2]
+    max_dimension = max(width, height)
+
+    # Calculate position to center the original image
+    x_offset = (max_dimension - width) // 2
+    y_offset = (max_dimension - height) // 2
+
+    # Write the background only into the padding stripes, then copy the pixels
+    # into the middle, instead of painting the whole canvas and pasting over it
+    canvas = np.empty((max_dimension, max_dimension, 3), dtype=np.uint8)
+    canvas[:y_offset] = background_color
+    canvas[y_offset + height:] = background_color
+    canvas[y_offset:y_offset + height, :x_offset] = background_color
+    canvas[y_offset:y_offset + height, x_offset + width:] = background_color
+    np.copyto(canvas[y_offset:y_offset + height, x_offset:x_offset + width], pixels)
+    return canvas
+
+
+def _square_array(pixels: np.ndarray, method: str, background_color: tuple) -> np.ndarray:
+    """
+    Convert an RGB pixel array to a square without going through PIL where possible
+
+    Args:
+        pixels: RGB pixels of shape (height, width, 3)
+        method: Method to use for conversion ('pad', 'crop', 'stretch')
+        background_color: RGB tuple for padding color
+
+    Returns:
+        Square RGB pixel array; for 'crop' this is a view into the input
+    """
+    height, width = pixels.shape[:2]
+
+    if method == 'pad':
+        square_pixels = _pad_pixels(pixels, background_color)
+
+    elif method == 'crop':
+        # A slice is a view, so cropping copies nothing
+        min_dimension = min(width, height)
+        left = (width - min_dimension) // 2
+        top = (height - min_dimension) // 2
+        square_pixels = pixels[top:top + min_dimension, left:left + min_dimension]
+
+    elif method == 'stretch':
+        target_size = max(width, height)
+        square_pixels = np.asarray(
+            Image.fromarray(pixels).resize((target_size, target_size), Image.Resampling.LANCZOS)
+        )
+
+    else:
+        raise ValueError(f"Invalid method '{method}'. Must be 'pad', 'crop', or 'stretch'")
+
+    side = square_pixels.shape[0]
+    logger.info(f"Converted pixel array to square using {method}: {width}x{height} -> {side}x{side}")
+    return square_pixels
+
+
+def convert_to_square(image: Union[Image.Image, np.ndarray], method: str = 'pad',
+                      background_color: tuple = (255, 255, 255)) -> Union[Image.Image, np.ndarray]:
     """
     Convert an image to a square format with aspect ratio 1:1
 
     Args:
-        image: PIL Image object to convert
+        image: PIL Image object, or RGB NumPy array of shape (height, width, 3), to convert
         method: Method to use for conversion ('pad', 'crop', 'stretch')
             - 'pad': Add padding to make square (preserves aspect ratio)
             - 'crop': Crop to square from center (may lose content)
@@ -66,10 +152,13 @@ def convert_to_square(image: Image.Image, method: str = 'pad', background_color:
         background_color: RGB tuple for padding color (default: white)
 
     Returns:
-        PIL Image object with 1:1 aspect ratio
+        PIL Image object with 1:1 aspect ratio, or a NumPy array if an array was passed
     """
+    if isinstance(image, np.ndarray):
+        return _square_array(image, method, background_color)
+
     if not isinstance(image, Image.Image):
-        raise ValueError("Input must be a PIL Image object")
+        raise ValueError("Input must be a PIL Image object or NumPy array")
 
     width, height = image.size
 
@@ -82,15 +171,8 @@ def convert_to_square(image: Image.Image, method: str = 'pad', background_color:
         # Add padding to make square
         max_dimension = max(width, height)
 
-        # Create new square image with background color
-        square_image = Image.new('RGB', (max_dimension, max_dimension), background_color)
-
-        # Calculate position to center the original image
-        x_offset = (max_dimension - width) // 2
-        y_offset = (max_dimension - height) // 2
-
-        # Paste original image onto square background
-        square_image.paste(image, (x_offset, y_offset))
+        pixels = np.asarray(image if image.mode == 'RGB' else image.convert('RGB'))
+        square_image = Image.fromarray(_pad_pixels(pixels, background_color))
 
         logger.info(f"Converted image to square using padding: {width}x{height} -> {max_dimension}x{max_dimension}")
 
@@ -133,6 +215,8 @@ def main():
     """
     import sys
 
+    log_pillow_build()
+
     # Sample usage - you can modify these paths
     input_image_path = Path("sample_input.jpg")  # Change this to your input image path
 
@@ -3,7 +3,7 @@
 Shopify Product Media Uploader
 
 This script scans a folder for media files (images and videos) and uploads them as product media to Shopify.
-The product ID is extracted from the filename using configurable patterns.
+The product is found by extracting the SKU from the filename and looking it up in Shopify.
 
 Supported formats:
     - Images: JPG, JPEG, PNG, BMP, GIF, TIFF, WebP
@@ -12,28 +12,107 @@ Supported formats:
 Usage:
     python src/shopify_image_uploader.py /path/to/media/folder
 
-Filename patterns supported:
-    - product_123_image.jpg -> Product ID: 123
-    - 456-variant-01.mp4 -> Product ID: 456
-    - SKU_789_photo.jpeg -> Product ID: 789
-    - Custom patterns can be configured in the script
+Filename pattern (matched by the precompiled _SKU_RE):
+    - NK-00001-0825-02.jpg -> SKU: NK-00001-0825
+    - NK-00001-0825.mp4 -> SKU: NK-00001-0825
 """
 
 import argparse
+import asyncio
+import binascii
+import io
+import json
 import logging
+import os
+import queue
+import random
+import re
+import sqlite3
+import stat
 import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 
+import httpx
 import requests
 import shopify
-from PIL import Image
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from urllib3.util.retry import Retry
 
 from config import ADMIN_API_ACCESS_TOKEN, SHOPIFY_STORE_URL, SUPPORTED_FORMATS
 
 # Supported video formats
-SUPPORTED_VIDEO_FORMATS = {'.mp4'}
-ALL_SUPPORTED_FORMATS = SUPPORTED_FORMATS | SUPPORTED_VIDEO_FORMATS
+SUPPORTED_VIDEO_FORMATS = frozenset({'.mp4'})
+SUPPORTED_IMAGE_FORMATS = frozenset(SUPPORTED_FORMATS)
+ALL_SUPPORTED_FORMATS = SUPPORTED_IMAGE_FORMATS | SUPPORTED_VIDEO_FORMATS
+
+# Admin API version used for GraphQL requests
+GRAPHQL_API_VERSION = "2023-10"
+
+# Admin API version used for REST requests
+REST_API_VERSION = "2024-07"
+
+# Leading bytes of each supported image format, and the suffix they map to
+_IMAGE_MAGIC = (
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF8', '.gif'),
+    (b'BM', '.bmp'),
+    (b'RIFF', '.webp'),
+    (b'II*\x00', '.tiff'),
+    (b'MM\x00*', '.tiff'),
+)
+
+# MIME type of every supported suffix, so uploads never consult the system mimetypes database
+_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.bmp': 'image/bmp',
+    '.gif': 'image/gif',
+    '.tif': 'image/tiff',
+    '.tiff': 'image/tiff',
+    '.webp': 'image/webp',
+    '.mp4': 'video/mp4',
+}
+
+# Suffix spellings that share a format
+_CANONICAL_SUFFIXES = {'.jpeg': '.jpg', '.tif': '.tiff'}
+
+# Images up to this size are read once and the buffer is reused for validation and upload
+MAX_BUFFERED_MEDIA_BYTES = 20 * 1024 * 1024
+
+# Default location of the persistent SKU -> product ID cache
+DEFAULT_SKU_CACHE_PATH = Path.home() / ".cache" / "kivoa" / "sku_map.sqlite"
+
+# Connections the async pipeline keeps open to staged upload storage
+MAX_ASYNC_CONNECTIONS = 32
+
+# Size of each read when streaming a file body
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+# Products uploaded at once when processing a folder (also caps parallel transfers per product)
+MAX_UPLOAD_WORKERS = 8
+
+# Products in flight at once in the asyncio pipeline
+MAX_IN_FLIGHT = 16
+
+# GraphQL requests wait as long as the requests.Session calls do (no timeout): large
+# productCreateMedia and batched product lookups can legitimately take a while
+GRAPHQL_TIMEOUT = httpx.Timeout(None)
+
+# Retries for a GraphQL request that comes back HTTP 429 or with a THROTTLED error
+MAX_THROTTLE_RETRIES = 5
+
+# SKU prefix of a media filename, e.g. "NK-00001-0825" in "NK-00001-0825-02.jpg"
+_SKU_RE = re.compile(r'^([A-Za-z]+-\d+-\d+)(?=[-.]|$)')
 
 # Configure logging
 logging.basicConfig(
@@ -43,54 +122,370 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def is_valid_media(media_path: Path) -> bool:
+def _classify(media_path: Path) -> Optional[str]:
+    """
+    Classify a media file by its extension
+
+    Args:
+        media_path: Path to the media file
+
+    Returns:
+        'image', 'video', or None if the extension is not supported
+    """
+    suffix = media_path.suffix.lower()
+    if suffix in SUPPORTED_IMAGE_FORMATS:
+        return 'image'
+    if suffix in SUPPORTED_VIDEO_FORMATS:
+        return 'video'
+    return None
+
+
+def _sniff_image_suffix(head: bytes) -> Optional[str]:
+    """
+    Identify an image format from its leading magic bytes
+
+    Args:
+        head: The first 12 bytes of the file
+
+    Returns:
+        Canonical suffix (e.g. '.jpg'), or None if the signature is not recognised
+    """
+    for magic, suffix in _IMAGE_MAGIC:
+        if head.startswith(magic):
+            # RIFF is a container; only RIFF....WEBP is an image
+            if suffix == '.webp' and head[8:12] != b'WEBP':
+                return None
+            return suffix
+    return None
+
+
+def is_valid_media(media_path: Path, data: Optional[bytes] = None) -> bool:
     """
     Check if file is a valid image or video
 
     Args:
         media_path: Path to the media file
+        data: Already-read file contents; images are verified from this buffer instead of re-reading the file
 
     Returns:
         True if valid media file, False otherwise
     """
     # Check file extension
-    if media_path.suffix.lower() not in ALL_SUPPORTED_FORMATS:
+    media_type = _classify(media_path)
+    if media_type is None:
         return False
 
-    # Check if file exists and is readable
-    if not media_path.exists() or not media_path.is_file():
+    # Check if file exists and is a regular file; one stat answers both and gives the size
+    try:
+        file_stat = media_path.stat()
+    except OSError:
+        return False
+    if not stat.S_ISREG(file_stat.st_mode):
         return False
 
-    # For images, try to open with PIL to validate
-    if media_path.suffix.lower() in SUPPORTED_FORMATS:
+    # For images, a signature matching the extension is enough for a pre-upload screen
+    # (Shopify rejects malformed files itself); anything else gets a full PIL verify
+    if media_type == 'image':
         try:
-            with Image.open(media_path) as img:
+            if data is not None:
+                head = data[:12]
+            else:
+                with open(media_path, 'rb') as f:
+                    head = f.read(12)
+            suffix = media_path.suffix.lower()
+            if _sniff_image_suffix(head) == _CANONICAL_SUFFIXES.get(suffix, suffix):
+                return True
+
+            from PIL import Image
+            with Image.open(io.BytesIO(data) if data is not None else media_path) as img:
                 img.verify()
             return True
         except Exception as e:
-            logger.error(f"Invalid image file {media_path}: {e}")
+            logger.error("Invalid image file %s: %s", media_path, e)
             return False
 
-    # For videos, just check if it's a readable file
-    elif media_path.suffix.lower() in SUPPORTED_VIDEO_FORMATS:
-        try:
-            # Basic validation - check if file is readable and has content
-            if media_path.stat().st_size > 0:
-                return True
-            else:
-                logger.error(f"Video file is empty: {media_path}")
-                return False
-        except Exception as e:
-            logger.error(f"Invalid video file {media_path}: {e}")
-            return False
+    # For videos, just check that the file has content
+    if file_stat.st_size > 0:
+        return True
 
+    logger.error("Video file is empty: %s", media_path)
     return False
 
+def scan_media_files(folder_path: Path) -> List[Path]:
+    """
+    List the supported media files directly inside a folder
+
+    Args:
+        folder_path: Path to the folder containing media files
+
+    Returns:
+        List of media file paths
+    """
+    # scandir reports the entry type from the directory listing, so no stat per file
+    with os.scandir(folder_path) as entries:
+        return [
+            Path(entry.path) for entry in entries
+            if os.path.splitext(entry.name)[1].lower() in ALL_SUPPORTED_FORMATS and entry.is_file()
+        ]
+
+
+def _read_media_buffer(media_path: Path) -> Optional[bytes]:
+    """
+    Read an image into memory if it is small enough to share between validation and upload
+
+    Args:
+        media_path: Path to the media file
+
+    Returns:
+        File contents, or None for videos and files larger than MAX_BUFFERED_MEDIA_BYTES
+    """
+    if _classify(media_path) != 'image':
+        return None
+
+    # Read through one handle so the size check and the read share a single open/fstat
+    with open(media_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > MAX_BUFFERED_MEDIA_BYTES:
+            return None
+        return f.read()
+
+
+def _read_at(file, size: int, offset: int) -> bytes:
+    """
+    Read up to size bytes at an absolute offset without relying on the shared file position
+
+    Args:
+        file: File object opened in binary mode
+        size: Maximum number of bytes to read
+        offset: Position to read from
+
+    Returns:
+        The bytes read; empty at end of file
+    """
+    if hasattr(os, 'pread'):
+        return os.pread(file.fileno(), size, offset)
+    file.seek(offset)
+    return file.read(size)
+
+
+def _multipart_envelope(fields: Dict[str, str], filename: str, mime_type: str) -> Tuple[bytes, bytes, str]:
+    """
+    Build the bytes that go around a file in a multipart/form-data body
+
+    Sending the preamble, the file and the trailer separately lets the file be
+    streamed without assembling the whole body in memory.
+
+    Args:
+        fields: Form fields sent ahead of the file
+        filename: Name reported for the file part
+        mime_type: MIME type of the file
+
+    Returns:
+        Tuple of (preamble, trailer, Content-Type header value)
+    """
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+        for name, value in fields.items()
+    ]
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: {mime_type}\r\n\r\n'
+    )
+    preamble = ''.join(parts).encode('utf-8')
+    trailer = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return preamble, trailer, f'multipart/form-data; boundary={boundary}'
+
+
+class _Base64JsonBody:
+    """Request body that base64-encodes a file between a JSON prefix and suffix while it is sent"""
+
+    # A multiple of 3 bytes, so each encoded chunk carries no padding
+    CHUNK_BYTES = STREAM_CHUNK_BYTES // 3 * 3
+
+    def __init__(self, path: Path, prefix: bytes, suffix: bytes):
+        """
+        Args:
+            path: File whose contents are encoded
+            prefix: Bytes sent before the encoded file
+            suffix: Bytes sent after the encoded file
+        """
+        self.path = path
+        self.prefix = prefix
+        self.suffix = suffix
+        self.file_size = path.stat().st_size
+
+    def __len__(self) -> int:
+        # Lets requests send a Content-Length instead of chunked transfer encoding
+        return len(self.prefix) + 4 * ((self.file_size + 2) // 3) + len(self.suffix)
+
+    def __iter__(self):
+        yield self.prefix
+        with open(self.path, 'rb') as f:
+            while chunk := f.read(self.CHUNK_BYTES):
+                yield binascii.b2a_base64(chunk, newline=False)
+        yield self.suffix
+
+
+def _empty_results() -> Dict[str, Any]:
+    """Create the results dictionary returned by the folder processing methods"""
+    return {
+        'total_files': 0,
+        'valid_images': 0,
+        'successful_uploads': 0,
+        'failed_uploads': 0,
+        'skipped_files': 0,
+        'errors': []
+    }
+
+
+@lru_cache(maxsize=4096)
+def extract_sku_from_filename(filename: str) -> Optional[str]:
+    """
+    Extract the SKU from a media filename
+
+    Args:
+        filename: The media filename (e.g., "NK-00001-0825-02.jpg")
+
+    Returns:
+        SKU (e.g., "NK-00001-0825"), or None if the filename doesn't match the pattern
+    """
+    match = _SKU_RE.match(filename)
+    return match.group(1) if match else None
+
+
+class SkuCache:
+    """Persistent (shop, SKU) -> product ID map backed by SQLite, so repeated runs skip the API lookup"""
+
+    def __init__(self, db_path: Path = DEFAULT_SKU_CACHE_PATH, ttl_seconds: float = 24 * 60 * 60,
+                 shop_url: str = SHOPIFY_STORE_URL):
+        """
+        Open (or create) the cache database
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl_seconds: How long a cached lookup stays valid
+            shop_url: Store the cached SKUs belong to
+        """
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.shop_url = shop_url
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sku_map ("
+            "shop_url TEXT NOT NULL, sku TEXT NOT NULL, product_id TEXT NOT NULL, api_version TEXT, fetched_at REAL, "
+            "PRIMARY KEY (shop_url, sku))"
+        )
+        self._conn.commit()
+
+    def get(self, sku: str) -> Optional[str]:
+        """
+        Look up a cached product ID
+
+        Args:
+            sku: The product SKU
+
+        Returns:
+            Product ID, or None if the SKU is not cached, expired or from another API version
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT product_id FROM sku_map WHERE shop_url = ? AND sku = ? AND api_version = ? AND fetched_at > ?",
+                (self.shop_url, sku, GRAPHQL_API_VERSION, time.time() - self.ttl_seconds)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def load(self) -> Dict[str, str]:
+        """
+        Read every fresh entry for this store, e.g. to warm an in-memory map
+
+        Returns:
+            Dictionary mapping SKU to product ID
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sku, product_id FROM sku_map WHERE shop_url = ? AND api_version = ? AND fetched_at > ?",
+                (self.shop_url, GRAPHQL_API_VERSION, time.time() - self.ttl_seconds)
+            ).fetchall()
+
+        return dict(rows)
+
+    def set(self, sku: str, product_id: str) -> None:
+        """
+        Store a resolved product ID
+
+        Args:
+            sku: The product SKU
+            product_id: The product ID it resolved to
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sku_map (shop_url, sku, product_id, api_version, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.shop_url, sku, product_id, GRAPHQL_API_VERSION, time.time())
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class LeakyBucket:
+    """Client-side mirror of Shopify's leaky bucket rate limit, shared across threads"""
+
+    def __init__(self, bucket_size: int = 40, leak_rate: float = 2.0):
+        """
+        Initialize the bucket
+
+        Args:
+            bucket_size: Maximum number of requests that can burst at once
+            leak_rate: Requests per second that drain from the bucket
+        """
+        self.bucket_size = bucket_size
+        self.leak_rate = leak_rate
+        self._level = 0.0
+        self._last_leak = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request slot is available in the bucket"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._level = max(0.0, self._level - (now - self._last_leak) * self.leak_rate)
+                self._last_leak = now
+
+                if self._level + 1 <= self.bucket_size:
+                    self._level += 1
+                    return
+
+                wait = (self._level + 1 - self.bucket_size) / self.leak_rate
+            time.sleep(wait)
+
+    def sync(self, used: float, limit: float) -> None:
+        """
+        Raise the local level to match the usage Shopify reports, so other clients
+        sharing the store's bucket are accounted for
+
+        Args:
+            used: Amount of the server-side bucket in use
+            limit: Size of the server-side bucket
+        """
+        if limit <= 0:
+            return
+        with self._lock:
+            self._level = max(self._level, used / limit * self.bucket_size)
+
 
 class ShopifyImageUploader:
     """Handles uploading images and videos to Shopify products"""
 
-    def __init__(self, shop_url: str, access_token: str):
+    def __init__(self, shop_url: str, access_token: str, use_staged_uploads: bool = True,
+                 sku_cache: Optional[SkuCache] = None):
         """
         Initialize Shopify connection
 
@@ -98,57 +493,98 @@ class ShopifyImageUploader:
             shop_url: Your Shopify store URL (e.g., 'your-store.myshopify.com')
             api_key: Shopify API key
             access_token: Shopify secret key
+            use_staged_uploads: Upload raw bytes to a staged URL and attach them with GraphQL;
+                if False, images are sent base64-encoded through the REST Image endpoint
+            sku_cache: Persistent SKU lookup cache; defaults to one for this store at DEFAULT_SKU_CACHE_PATH
         """
         self.shop_url = shop_url
         self.access_token = access_token
+        self.use_staged_uploads = use_staged_uploads
+
+        # Reused for staged uploads so connections to the storage host stay open between files.
+        # Staged targets are keyed per upload, so retrying a PUT just overwrites the same object
+        # (urllib3 rewinds file bodies before a retry); streamed multipart POSTs can't be rewound
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                        allowed_methods=frozenset({'GET', 'PUT'}))
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retries))
+
+        # GraphQL calls go over HTTP/2, so concurrent workers multiplex one connection to the shop
+        self.graphql_client = httpx.Client(http2=True, timeout=GRAPHQL_TIMEOUT,
+                                           limits=httpx.Limits(max_connections=16))
+
+        # Shared across worker threads so concurrent callers stay under the API limit
+        self.rate_limiter = LeakyBucket()
+
+        # SKU lookups are served from memory, warmed from disk and written through on each resolve
+        self.sku_cache = sku_cache or SkuCache(shop_url=shop_url)
+        self._sku_map = self.sku_cache.load()
+        self._sku_map_lock = threading.Lock()
+
+        # Products looked up by ID, filled in bulk by _prefetch_products before a folder upload
+        self._product_cache: Dict[str, shopify.Product] = {}
+        self._product_cache_lock = threading.Lock()
 
         # Configure Shopify session
-        self.session = shopify.Session(shop_url, "2024-07", access_token)
+        self.session = shopify.Session(shop_url, REST_API_VERSION, access_token)
         shopify.ShopifyResource.activate_session(self.session)
 
         # Test connection
         try:
             shop = shopify.Shop.current()
-            logger.info(f"Connected to Shopify store: {shop.name}")
+            logger.info("Connected to Shopify store: %s", shop.name)
         except Exception as e:
-            logger.error(f"Failed to connect to Shopify: {e}")
+            logger.error("Failed to connect to Shopify: %s", e)
             raise e
 
+    def close(self) -> None:
+        """Close the staged upload session and the GraphQL client together"""
+        self.http.close()
+        self.graphql_client.close()
+
     def extract_product_id_from_filename(self, filename: str) -> Optional[str]:
         """
         Extract product ID from filename by extracting SKU and looking it up in Shopify
 
         Args:
-            filename: The image filename (e.g., "NK-00001-0825-02.jpg")
+            filename: The image filename (e.g., "NK-00001-0825-02.jpg"); a path is also accepted
 
         Returns:
             Product ID as string, or None if not found
         """
         try:
-            # Extract SKU from filename
+            # Extract SKU from filename, keyed on the basename so paths share the memoized entry
             # Example: "NK-00001-0825-02.jpg" -> "NK-00001-0825"
-            name_without_ext = filename.rsplit('.', 1)[0]  # NK-00001-0825-02
-
-            # Split on dashes
-            parts = name_without_ext.split('-')  # ['NK', '00001', '0825', '02']
-
-            # Join the first three parts to get the SKU
-            if len(parts) >= 3:
-                sku = '-'.join(parts[:3])  # NK-00001-0825
-            else:
-                logger.warning(f"Filename {filename} doesn't match expected SKU pattern")
+            sku = extract_sku_from_filename(os.path.basename(filename))
+            if not sku:
+                logger.warning("Filename %s doesn't match expected SKU pattern", filename)
                 return None
 
-            logger.info(f"Extracted SKU '{sku}' from filename '{filename}'")
+            logger.info("Extracted SKU '%s' from filename '%s'", sku, filename)
 
             # Look up product by SKU using Shopify API
             return self.search_product_by_sku_graphql(sku)
 
         except Exception as e:
-            logger.error(f"Error extracting product ID from filename {filename}: {e}")
+            logger.error("Error extracting product ID from filename %s: %s", filename, e)
             raise e
 
 
+    async def aextract_product_id_from_filename(self, filename: str) -> Optional[str]:
+        """
+        Async variant of extract_product_id_from_filename
+
+        The Shopify client is synchronous, so the lookup runs on a worker thread;
+        gathering many of these overlaps their network round-trips.
+
+        Args:
+            filename: The image filename (e.g., "NK-00001-0825-02.jpg")
+
+        Returns:
+            Product ID as string, or None if not found
+        """
+        return await asyncio.to_thread(self.extract_product_id_from_filename, filename)
+
     def search_product_by_sku_graphql(self, sku: str) -> Optional[str]:
         """
         Search for product by SKU using GraphQL API (more efficient for large catalogs)
@@ -159,6 +595,12 @@ class ShopifyImageUploader:
         Returns:
             Product ID as string, or None if not found
         """
+        with self._sku_map_lock:
+            cached = self._sku_map.get(sku)
+        if cached:
+            logger.info("Using cached product %s for SKU '%s'", cached, sku)
+            return cached
+
         try:
             # GraphQL query to search for products by SKU
             query = """
@@ -201,17 +643,151 @@ class ShopifyImageUploader:
                             # Extract numeric ID from GraphQL ID (e.g., "gid://shopify/Product/123" -> "123")
                             product_gid = product['id']
                             product_id = product_gid.split('/')[-1]
-                            logger.info(f"Found product {product_id} with title '{product['title']}' for SKU '{sku}' via GraphQL")
+                            logger.info("Found product %s with title '%s' for SKU '%s' via GraphQL",
+                                        product_id, product['title'], sku)
+                            self._remember_skus({sku: product_id})
                             return product_id
 
-            logger.warning(f"No product found for SKU '{sku}' via GraphQL search")
+            logger.warning("No product found for SKU '%s' via GraphQL search", sku)
             return None
 
         except Exception as e:
-            logger.error(f"Error searching for product with SKU {sku} via GraphQL: {e}")
+            logger.error("Error searching for product with SKU %s via GraphQL: %s", sku, e)
             raise e
 
 
+    def bulk_resolve_skus(self, skus: Iterable[str], batch_size: int = 50) -> Dict[str, str]:
+        """
+        Resolve many SKUs to product IDs using OR'd GraphQL search queries
+
+        Variants are queried directly rather than nested under products, keeping each query
+        far below Shopify's per-query cost limit; every page of results is followed. A batch
+        whose query fails is looked up one SKU at a time instead.
+
+        Args:
+            skus: The product SKUs to look up
+            batch_size: Number of SKUs OR'd together per query (kept small for Shopify's query length limit)
+
+        Returns:
+            Dictionary mapping each found SKU to its product ID; SKUs without a product are omitted
+        """
+        query = """
+        query getVariantsBySkus($query: String!, $after: String) {
+            productVariants(first: 250, query: $query, after: $after) {
+                edges {
+                    node {
+                        sku
+                        product {
+                            id
+                        }
+                    }
+                }
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+            }
+        }
+        """
+
+        unique_skus = list(dict.fromkeys(skus))
+
+        # Only SKUs missing from the cache need a query
+        with self._sku_map_lock:
+            sku_to_product_id = {sku: self._sku_map[sku] for sku in unique_skus if sku in self._sku_map}
+        missing_skus = [sku for sku in unique_skus if sku not in sku_to_product_id]
+        resolved = {}
+
+        for start in range(0, len(missing_skus), batch_size):
+            batch = missing_skus[start:start + batch_size]
+            wanted = set(batch)
+            variables = {
+                "query": " OR ".join(f"sku:{sku}" for sku in batch),
+                "after": None
+            }
+
+            while True:
+                response = self._execute_graphql_query(query, variables)
+                variants = (response.get('data') or {}).get('productVariants')
+                if response.get('errors') or variants is None:
+                    logger.error("Bulk SKU lookup failed, resolving %s SKUs one at a time: %s",
+                                 len(batch), response.get('errors'))
+                    for sku in wanted.difference(resolved):
+                        product_id = self.search_product_by_sku_graphql(sku)
+                        if product_id:
+                            resolved[sku] = product_id
+                    break
+
+                for variant_edge in variants['edges']:
+                    variant = variant_edge['node']
+                    sku = variant.get('sku')
+                    if sku in wanted and variant.get('product'):
+                        # Extract numeric ID from GraphQL ID (e.g., "gid://shopify/Product/123" -> "123")
+                        resolved.setdefault(sku, variant['product']['id'].split('/')[-1])
+
+                page_info = variants.get('pageInfo') or {}
+                if not page_info.get('hasNextPage'):
+                    break
+                variables["after"] = page_info['endCursor']
+
+        self._remember_skus(resolved)
+        sku_to_product_id.update(resolved)
+        logger.info("Resolved %s of %s SKUs (%s from cache)",
+                    len(sku_to_product_id), len(unique_skus), len(unique_skus) - len(missing_skus))
+        return sku_to_product_id
+
+    def _remember_skus(self, sku_to_product_id: Dict[str, str]) -> None:
+        """
+        Record resolved SKUs in memory and write them through to the persistent cache
+
+        Args:
+            sku_to_product_id: Newly resolved SKU -> product ID pairs
+        """
+        with self._sku_map_lock:
+            self._sku_map.update(sku_to_product_id)
+        for sku, product_id in sku_to_product_id.items():
+            self.sku_cache.set(sku, product_id)
+
+    def _prefetch_products(self, product_ids: Iterable[str], batch_size: int = 250) -> None:
+        """
+        Load many products with paged GraphQL nodes queries so get_product can skip Product.find
+
+        Args:
+            product_ids: Numeric product IDs to load
+            batch_size: IDs per query (Shopify accepts up to 250)
+        """
+        query = """
+        query getProducts($ids: [ID!]!) {
+            nodes(ids: $ids) {
+                ... on Product {
+                    id
+                    title
+                }
+            }
+        }
+        """
+
+        with self._product_cache_lock:
+            missing = [str(product_id) for product_id in dict.fromkeys(product_ids)
+                       if str(product_id) not in self._product_cache]
+
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            variables = {"ids": [f"gid://shopify/Product/{product_id}" for product_id in batch]}
+
+            response = self._execute_graphql_query(query, variables)
+            nodes = (response.get('data') or {}).get('nodes') or []
+
+            with self._product_cache_lock:
+                for node in nodes:
+                    # Unknown IDs come back as null and are left for get_product to report
+                    if node and node.get('id'):
+                        product_id = node['id'].split('/')[-1]
+                        self._product_cache[product_id] = shopify.Product({'id': int(product_id),
+                                                                           'title': node.get('title')})
+
+        logger.info("Prefetched %s products via GraphQL", len(missing))
+
     def get_product(self, product_id: str) -> Optional[shopify.Product]:
         """
         Get product by ID from Shopify
@@ -222,15 +798,24 @@ class ShopifyImageUploader:
         Returns:
             Shopify Product object or None if not found
         """
+        with self._product_cache_lock:
+            cached = self._product_cache.get(str(product_id))
+        if cached is not None:
+            return cached
+
         try:
+            self.rate_limiter.acquire()
             product = shopify.Product.find(product_id)
-            logger.info(f"Found product: {product.title} (ID: {product_id})")
+            logger.info("Found product: %s (ID: %s)", product.title, product_id)
+            with self._product_cache_lock:
+                self._product_cache[str(product_id)] = product
             return product
         except Exception as e:
-            logger.error(f"Product with ID {product_id} not found: {e}")
+            logger.error("Product with ID %s not found: %s", product_id, e)
             return None
 
-    def upload_media_to_product(self, product_id: str, media_path: Path, alt_text: str = None) -> bool:
+    def upload_media_to_product(self, product_id: str, media_path: Path, alt_text: str = None,
+                                data: Optional[bytes] = None, *, presumed_valid: bool = False) -> bool:
         """
         Upload an image or video to a Shopify product
 
@@ -238,6 +823,9 @@ class ShopifyImageUploader:
             product_id: The product ID
             media_path: Path to the media file (image or video)
             alt_text: Alternative text for the media
+            data: Already-read file contents, reused instead of reading the file again
+            presumed_valid: Set when the caller has already checked the file with is_valid_media,
+                so it is not opened and verified a second time
 
         Returns:
             True if successful, False otherwise
@@ -249,39 +837,499 @@ class ShopifyImageUploader:
                 return False
 
             # Validate media file
-            if not is_valid_media(media_path):
-                logger.error(f"Invalid media file: {media_path}")
+            if not presumed_valid and not is_valid_media(media_path, data):
+                logger.error("Invalid media file: %s", media_path)
                 return False
 
             # Check if it's a video or image
-            is_video = media_path.suffix.lower() in SUPPORTED_VIDEO_FORMATS
+            is_video = _classify(media_path) == 'video'
 
             if is_video:
-                return False
+                if not self.use_staged_uploads:
+                    logger.error("Video uploads require staged uploads: %s", media_path)
+                    return False
+                return self._upload_media_staged(product_id, [(media_path, None, alt_text)])[0]
             else:
-                return self._upload_image_to_product(product, media_path, alt_text)
+                return self._upload_image_to_product(product, media_path, alt_text, data)
 
         except Exception as e:
             raise e
 
-    def _upload_image_to_product(self, product: shopify.Product, image_path: Path, alt_text: str = None) -> bool:
-        import base64
-        with open(image_path, "rb") as f:
-            image_data = f.read()
-        encoded_image = base64.b64encode(image_data).decode("utf-8")
-
-        # Create new image
-        new_image = shopify.Image()
-        new_image.product_id = product.id
-        new_image.alt = alt_text or image_path.stem
-        new_image.attachment = encoded_image
-        success = new_image.save()
-
-        if success:
-            print(f"Image uploaded successfully: {new_image.src}")
+    async def aupload_media_to_product(self, product_id: str, media_path: Path, alt_text: str = None) -> bool:
+        """
+        Async variant of upload_media_to_product, run on a worker thread
+
+        Args:
+            product_id: The product ID
+            media_path: Path to the media file (image or video)
+            alt_text: Alternative text for the media
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await asyncio.to_thread(self.upload_media_to_product, product_id, media_path, alt_text)
+
+    def _upload_image_to_product(self, product: shopify.Product, image_path: Path, alt_text: str = None,
+                                 image_data: Optional[bytes] = None) -> bool:
+        """
+        Upload an image to a product, via staged upload unless the legacy REST path is selected
+
+        Args:
+            product: The Shopify product
+            image_path: Path to the image file
+            alt_text: Alternative text for the image
+            image_data: Already-read file contents, reused instead of reading the file again
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if self.use_staged_uploads:
+            return self._upload_media_staged(str(product.id), [(image_path, image_data, alt_text)])[0]
+        return self._upload_image_via_rest(product, image_path, alt_text, image_data)
+
+    def _upload_image_via_rest(self, product: shopify.Product, image_path: Path, alt_text: str = None,
+                               image_data: Optional[bytes] = None) -> bool:
+        """
+        Upload an image base64-encoded through the REST Image endpoint
+
+        The JSON body is assembled as bytes around the base64 text, instead of through
+        shopify.Image, which decodes the text to a str and re-escapes it in json.dumps.
+
+        Args:
+            product: The Shopify product
+            image_path: Path to the image file
+            alt_text: Alternative text for the image
+            image_data: Already-read file contents, reused instead of reading the file again;
+                without it the file is streamed and never held in memory whole
+
+        Returns:
+            True if successful, False otherwise
+        """
+        prefix = b''.join((b'{"image":{"alt":', json.dumps(alt_text or image_path.stem).encode('utf-8'),
+                           b',"attachment":"'))
+        suffix = b'"}}'
+        if image_data is None:
+            # Files too large to have been buffered are encoded chunk by chunk as they are sent
+            body = _Base64JsonBody(image_path, prefix, suffix)
+        else:
+            # One C call straight to the base64 text; base64 needs no JSON escaping
+            body = b''.join((prefix, binascii.b2a_base64(image_data, newline=False), suffix))
+            del image_data
+
+        url = f"https://{self.shop_url}/admin/api/{REST_API_VERSION}/products/{product.id}/images.json"
+        self.rate_limiter.acquire()
+        response = self.http.post(
+            url,
+            data=body,
+            headers={
+                'Content-Type': 'application/json',
+                'X-Shopify-Access-Token': self.access_token
+            }
+        )
+        result = response.json() if response.content else {}
+        self._sync_rate_limit(response, result)
+
+        if response.ok and 'image' in result:
+            print(f"Image uploaded successfully: {result['image'].get('src')}")
+            return True
+        print("Image upload failed:", result.get('errors', response.status_code))
+        return False
+
+    def upload_media_batch_to_product(self, product_id: str,
+                                      media: List[Tuple[Path, Optional[bytes]]]) -> List[bool]:
+        """
+        Upload several already-validated media files to one product
+
+        With staged uploads, all files are staged in one stagedUploadsCreate call, transferred
+        in parallel and attached with a single productCreateMedia mutation.
+
+        Args:
+            product_id: The product ID
+            media: (path, already-read contents or None) pairs; files must have passed is_valid_media
+
+        Returns:
+            Upload success for each file, in the order given
+        """
+        if not self.use_staged_uploads:
+            return [
+                self.upload_media_to_product(product_id, media_path, data=data, presumed_valid=True)
+                for media_path, data in media
+            ]
+
+        if not self.get_product(product_id):
+            return [False] * len(media)
+
+        return self._upload_media_staged(product_id, [(media_path, data, None) for media_path, data in media])
+
+    def _upload_media_staged(self, product_id: str,
+                             media: List[Tuple[Path, Optional[bytes], Optional[str]]]) -> List[bool]:
+        """
+        Upload media files to staged URLs and attach them to a product
+
+        The raw bytes go straight to Shopify's storage, so nothing is base64-encoded.
+
+        Args:
+            product_id: The product ID
+            media: (path, already-read contents or None, alt text or None) for each file
+
+        Returns:
+            Upload success for each file, in the order given
+        """
+        uploads = [self._describe_upload(media_path, data, alt_text) for media_path, data, alt_text in media]
+
+        targets = self._create_staged_uploads(uploads)
+        if not targets:
+            return [False] * len(uploads)
+
+        def transfer(upload: Dict[str, Any], target: Dict[str, Any]) -> bool:
+            return self._upload_file_to_staged_url(target, upload['path'], upload['mime_type'],
+                                                   upload['http_method'], upload['data'])
+
+        # Send the files to storage in parallel; they are independent of each other
+        if len(uploads) == 1:
+            transferred = [transfer(uploads[0], targets[0])]
         else:
-            print("Image upload failed:", new_image.errors.full_messages())
-        return success
+            with ThreadPoolExecutor(max_workers=min(len(uploads), MAX_UPLOAD_WORKERS)) as executor:
+                transferred = list(executor.map(transfer, uploads, targets))
+
+        attach = [index for index, ok in enumerate(transferred) if ok]
+        if not attach:
+            return transferred
+
+        attached = self._create_product_media(product_id, [
+            {
+                "originalSource": targets[index]['resourceUrl'],
+                "alt": uploads[index]['alt'],
+                "mediaContentType": uploads[index]['resource']
+            }
+            for index in attach
+        ])
+
+        outcomes = [False] * len(uploads)
+        for index, ok in zip(attach, attached):
+            outcomes[index] = ok
+        return outcomes
+
+    @staticmethod
+    def _describe_upload(media_path: Path, data: Optional[bytes], alt_text: Optional[str]) -> Dict[str, Any]:
+        """
+        Describe one file for stagedUploadsCreate and the transfer that follows it
+
+        Args:
+            media_path: Path to the media file
+            data: Already-read file contents, or None to stream the file
+            alt_text: Alternative text for the media
+
+        Returns:
+            Dict with 'path', 'data', 'alt', 'resource', 'mime_type', 'file_size' and 'http_method'
+        """
+        resource = 'VIDEO' if _classify(media_path) == 'video' else 'IMAGE'
+        return {
+            'path': media_path,
+            'data': data,
+            'alt': alt_text or media_path.stem,
+            'resource': resource,
+            'mime_type': _MIME_TYPES.get(media_path.suffix.lower(), 'application/octet-stream'),
+            'file_size': len(data) if data is not None else media_path.stat().st_size,
+            # Images can be PUT as a raw body; videos only accept a multipart POST
+            'http_method': 'PUT' if resource == 'IMAGE' else 'POST',
+        }
+
+    async def _aupload_video(self, client: httpx.AsyncClient, product_id: str, media_path: Path,
+                             alt_text: Optional[str] = None) -> bool:
+        """
+        Upload one video through a staged target without blocking the event loop on the transfer
+
+        The two GraphQL calls still go through the shared synchronous client on a worker
+        thread; the storage POST, which dominates for large files, is streamed on the
+        event loop so many videos can be in flight while others are being attached.
+
+        Args:
+            client: Async HTTP client used for the storage transfer
+            product_id: The product ID
+            media_path: Path to the video file
+            alt_text: Alternative text for the media
+
+        Returns:
+            True if successful, False otherwise
+        """
+        upload = self._describe_upload(media_path, None, alt_text)
+        targets = await asyncio.to_thread(self._create_staged_uploads, [upload])
+        if not targets:
+            return False
+        target = targets[0]
+
+        if not await self._aupload_file_to_staged_url(client, target, media_path, upload['mime_type']):
+            return False
+
+        attached = await asyncio.to_thread(self._create_product_media, product_id, [{
+            "originalSource": target['resourceUrl'],
+            "alt": upload['alt'],
+            "mediaContentType": upload['resource']
+        }])
+        return attached[0]
+
+    async def _aupload_file_to_staged_url(self, client: httpx.AsyncClient, target: Dict[str, Any],
+                                          media_path: Path, mime_type: str) -> bool:
+        """
+        Stream a file to a multipart POST staged target
+
+        Args:
+            client: Async HTTP client used for the transfer
+            target: Staged target returned by _create_staged_uploads
+            media_path: Path to the media file
+            mime_type: MIME type of the file
+
+        Returns:
+            True if successful, False otherwise
+        """
+        parameters = {param['name']: param['value'] for param in target.get('parameters', [])}
+        preamble, trailer, content_type = _multipart_envelope(parameters, media_path.name, mime_type)
+
+        try:
+            with open(media_path, 'rb') as f:
+                file_size = os.fstat(f.fileno()).st_size
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+                def read_chunk(offset: int) -> Any:
+                    # Disk reads happen on a worker thread so the loop keeps other transfers moving
+                    return asyncio.ensure_future(asyncio.to_thread(_read_at, f, STREAM_CHUNK_BYTES, offset))
+
+                async def body():
+                    yield preamble
+                    # Read the next chunk while the current one is being sent, so disk and network overlap
+                    offset = 0
+                    pending = read_chunk(offset)
+                    try:
+                        while chunk := await pending:
+                            offset += len(chunk)
+                            pending = read_chunk(offset)
+                            yield chunk
+                    finally:
+                        pending.cancel()
+                    yield trailer
+
+                response = await client.post(
+                    target['url'],
+                    content=body(),
+                    headers={
+                        'Content-Type': content_type,
+                        'Content-Length': str(len(preamble) + file_size + len(trailer)),
+                    }
+                )
+            response.raise_for_status()
+            return True
+
+        except Exception as e:
+            logger.error("Staged upload of %s failed: %s", media_path.name, e)
+            return False
+
+    def _create_staged_uploads(self, uploads: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Reserve staged upload targets with one stagedUploadsCreate mutation
+
+        Args:
+            uploads: One dict per file with 'path', 'mime_type', 'file_size', 'resource' and 'http_method'
+
+        Returns:
+            Staged targets with 'url', 'resourceUrl' and 'parameters', in the same order, or None on failure
+        """
+        mutation = """
+        mutation stagedUploadsCreate($input: [StagedUploadInput!]!) {
+            stagedUploadsCreate(input: $input) {
+                stagedTargets {
+                    url
+                    resourceUrl
+                    parameters {
+                        name
+                        value
+                    }
+                }
+                userErrors {
+                    field
+                    message
+                }
+            }
+        }
+        """
+
+        variables = {
+            "input": [
+                {
+                    "filename": upload['path'].name,
+                    "mimeType": upload['mime_type'],
+                    "fileSize": str(upload['file_size']),
+                    "resource": upload['resource'],
+                    "httpMethod": upload['http_method']
+                }
+                for upload in uploads
+            ]
+        }
+
+        filenames = ", ".join(upload['path'].name for upload in uploads)
+        response = self._execute_graphql_query(mutation, variables)
+        result = (response.get('data') or {}).get('stagedUploadsCreate') or {}
+
+        if result.get('userErrors'):
+            logger.error("stagedUploadsCreate failed for %s: %s", filenames, result['userErrors'])
+            return None
+
+        targets = result.get('stagedTargets') or []
+        if len(targets) != len(uploads):
+            logger.error("stagedUploadsCreate returned %s targets for %s files (%s)",
+                         len(targets), len(uploads), filenames)
+            return None
+
+        return targets
+
+    def _upload_file_to_staged_url(self, target: Dict[str, Any], media_path: Path, mime_type: str,
+                                   http_method: str, data: Optional[bytes] = None) -> bool:
+        """
+        Send the file bytes to a staged upload target
+
+        Args:
+            target: Staged target returned by _create_staged_uploads
+            media_path: Path to the media file
+            mime_type: MIME type of the file
+            http_method: 'PUT' or 'POST', matching the method the target was created for
+            data: Already-read file contents, sent instead of streaming the file
+
+        Returns:
+            True if successful, False otherwise
+        """
+        parameters = {param['name']: param['value'] for param in target.get('parameters', [])}
+
+        try:
+            with open(media_path, 'rb') as f:
+                body = data if data is not None else f
+                if http_method == 'PUT':
+                    # PUT targets expect the signed parameters as headers
+                    headers = {'Content-Type': parameters.get('content_type', mime_type)}
+                    if 'acl' in parameters:
+                        headers['x-goog-acl'] = parameters['acl']
+                    response = self.http.put(target['url'], data=body, headers=headers)
+                else:
+                    # Stream the multipart body off disk instead of building it in memory
+                    encoder = MultipartEncoder(fields={**parameters, 'file': (media_path.name, body, mime_type)})
+                    response = self.http.post(
+                        target['url'],
+                        data=encoder,
+                        headers={'Content-Type': encoder.content_type}
+                    )
+            response.raise_for_status()
+            return True
+
+        except Exception as e:
+            logger.error("Staged upload of %s failed: %s", media_path.name, e)
+            return False
+
+    def _create_product_media(self, product_id: str, media: List[Dict[str, str]]) -> List[bool]:
+        """
+        Attach uploaded files to a product with one productCreateMedia mutation
+
+        Args:
+            product_id: The product ID
+            media: CreateMediaInput dicts ('originalSource', 'alt', 'mediaContentType')
+
+        Returns:
+            Success for each media item, in the order given
+        """
+        mutation = """
+        mutation productCreateMedia($productId: ID!, $media: [CreateMediaInput!]!) {
+            productCreateMedia(productId: $productId, media: $media) {
+                media {
+                    alt
+                    mediaContentType
+                    status
+                }
+                mediaUserErrors {
+                    field
+                    message
+                }
+            }
+        }
+        """
+
+        variables = {
+            "productId": f"gid://shopify/Product/{product_id}",
+            "media": media
+        }
+
+        response = self._execute_graphql_query(mutation, variables)
+        result = (response.get('data') or {}).get('productCreateMedia')
+
+        if not result:
+            logger.error("productCreateMedia failed for product %s", product_id)
+            return [False] * len(media)
+
+        outcomes = [True] * len(media)
+        for error in result.get('mediaUserErrors') or []:
+            logger.error("productCreateMedia failed for product %s: %s", product_id, error)
+            # Errors point at the failing item as ["media", "<index>", ...]; anything else fails the batch
+            field = error.get('field') or []
+            if (len(field) > 1 and field[0] == 'media' and str(field[1]).isdigit()
+                    and int(field[1]) < len(media)):
+                outcomes[int(field[1])] = False
+            else:
+                outcomes = [False] * len(media)
+
+        logger.info("Attached %s of %s media to product %s", sum(outcomes), len(media), product_id)
+        return outcomes
+
+
+    def _sync_rate_limit(self, response, result: dict) -> None:
+        """
+        Feed Shopify's reported API usage back into the rate limiter
+
+        REST responses carry X-Shopify-Shop-Api-Call-Limit ("used/size"); GraphQL
+        responses report the cost bucket in extensions.cost.throttleStatus.
+
+        Args:
+            response: The HTTP response (httpx or requests)
+            result: The decoded JSON body
+        """
+        call_limit = response.headers.get('X-Shopify-Shop-Api-Call-Limit')
+        if call_limit and '/' in call_limit:
+            used, size = call_limit.split('/', 1)
+            self.rate_limiter.sync(float(used), float(size))
+            return
+
+        throttle = ((result.get('extensions') or {}).get('cost') or {}).get('throttleStatus')
+        if throttle:
+            maximum = throttle['maximumAvailable']
+            self.rate_limiter.sync(maximum - throttle['currentlyAvailable'], maximum)
+
+
+    @staticmethod
+    def _graphql_throttle_delay(result: dict, attempt: int) -> Optional[float]:
+        """
+        Return how long to wait before retrying a THROTTLED GraphQL response, or None if it wasn't throttled
+
+        The wait is the time Shopify needs to restore enough of the cost bucket for the
+        query, falling back to exponential backoff when throttleStatus is missing.
+
+        Args:
+            result: The decoded JSON body
+            attempt: Zero-based attempt number
+
+        Returns:
+            Delay in seconds, or None
+        """
+        errors = result.get('errors')
+        if not isinstance(errors, list) or not any(
+                isinstance(error, dict) and (error.get('extensions') or {}).get('code') == 'THROTTLED'
+                for error in errors):
+            return None
+
+        cost = (result.get('extensions') or {}).get('cost') or {}
+        throttle = cost.get('throttleStatus') or {}
+        restore_rate = throttle.get('restoreRate')
+        requested = cost.get('requestedQueryCost')
+        if restore_rate and requested is not None:
+            deficit = requested - throttle.get('currentlyAvailable', 0)
+            return max(deficit / restore_rate, 1.0 / restore_rate)
+        return 2 ** attempt
 
 
     def _execute_graphql_query(self, query: str, variables: dict = None) -> dict:
@@ -296,7 +1344,7 @@ class ShopifyImageUploader:
             Response dictionary
         """
         try:
-            url = f"https://{self.shop_url}/admin/api/2023-10/graphql.json"
+            url = f"https://{self.shop_url}/admin/api/{GRAPHQL_API_VERSION}/graphql.json"
             headers = {
                 'Content-Type': 'application/json',
                 'X-Shopify-Access-Token': self.access_token
@@ -307,90 +1355,312 @@ class ShopifyImageUploader:
                 'variables': variables or {}
             }
 
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-
-            return response.json()
+            for attempt in range(MAX_THROTTLE_RETRIES + 1):
+                self.rate_limiter.acquire()
+                response = self.graphql_client.post(url, json=payload, headers=headers)
+                if response.status_code == 429:
+                    delay = float(response.headers.get('Retry-After', 0)) or 2 ** attempt
+                    if attempt == MAX_THROTTLE_RETRIES:
+                        response.raise_for_status()
+                else:
+                    response.raise_for_status()
+                    result = response.json()
+                    self._sync_rate_limit(response, result)
+                    # Cost-based throttling comes back as HTTP 200 with a THROTTLED error
+                    delay = self._graphql_throttle_delay(result, attempt)
+                    if delay is None or attempt == MAX_THROTTLE_RETRIES:
+                        return result
+
+                # Throttled: back off, with jitter so concurrent workers don't retry in lockstep
+                delay *= random.uniform(1.0, 1.5)
+                logger.warning("GraphQL request throttled, retrying in %.1fs", delay)
+                time.sleep(delay)
 
         except Exception as e:
-            logger.error(f"GraphQL query failed: {e}")
+            logger.error("GraphQL query failed: %s", e)
             return {}
 
 
-    def process_folder(self, folder_path: Path, dry_run: bool = False) -> Dict[str, Any]:
+    def process_folder(self, folder_path: Path, dry_run: bool = False,
+                       max_workers: int = MAX_UPLOAD_WORKERS) -> Dict[str, Any]:
         """
         Process all media files (images and videos) in a folder and upload them to Shopify
 
         Args:
             folder_path: Path to the folder containing media files
             dry_run: If True, only simulate the process without uploading
+            max_workers: Number of files validated and uploaded concurrently
 
         Returns:
             Dictionary with processing results
         """
-        results = {
-            'total_files': 0,
-            'valid_images': 0,
-            'successful_uploads': 0,
-            'failed_uploads': 0,
-            'skipped_files': 0,
-            'errors': []
-        }
-
         if not folder_path.exists() or not folder_path.is_dir():
+            results = _empty_results()
             error_msg = f"Folder does not exist or is not a directory: {folder_path}"
             logger.error(error_msg)
             results['errors'].append(error_msg)
             return results
 
         # Get all media files in the folder
-        media_files = []
-        for file_path in folder_path.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in ALL_SUPPORTED_FORMATS:
-                media_files.append(file_path)
+        media_files = scan_media_files(folder_path)
+        logger.info("Found %s media files in %s", len(media_files), folder_path)
+
+        return self.process_entries(media_files, dry_run=dry_run, max_workers=max_workers)
+
+    def process_entries(self, media_files: List[Path], dry_run: bool = False,
+                        max_workers: int = MAX_UPLOAD_WORKERS) -> Dict[str, Any]:
+        """
+        Upload an already-scanned list of media files to Shopify
+
+        Files are grouped by product and flow through two overlapping stages: a CPU-sized
+        pool reads and verifies each group, and max_workers upload threads consume the
+        validated groups, uploading each product's files as one batch.
 
+        Args:
+            media_files: Paths to the media files, e.g. from scan_media_files
+            dry_run: If True, only simulate the process without uploading
+            max_workers: Number of products uploaded concurrently
+
+        Returns:
+            Dictionary with processing results
+        """
+        results = _empty_results()
         results['total_files'] = len(media_files)
-        logger.info(f"Found {len(media_files)} media files in {folder_path}")
+        results_lock = threading.Lock()
+
+        # Resolve every SKU up front with a few OR'd queries instead of one lookup per file
+        file_skus = {media_path: extract_sku_from_filename(media_path.name) for media_path in media_files}
+        sku_to_product_id = self.bulk_resolve_skus(sku for sku in file_skus.values() if sku)
+        if not dry_run:
+            self._prefetch_products(sku_to_product_id.values())
 
-        # Process each media file
+        product_files = defaultdict(list)
         for media_path in media_files:
-            try:
-                logger.info(f"Processing: {media_path.name}")
+            # Look up the product ID resolved for this file's SKU
+            sku = file_skus[media_path]
+            if not sku:
+                logger.warning("Filename %s doesn't match expected SKU pattern", media_path.name)
+                results['skipped_files'] += 1
+                continue
+
+            product_id = sku_to_product_id.get(sku)
+            if not product_id:
+                logger.warning("No product found for SKU '%s'", sku)
+                results['skipped_files'] += 1
+                continue
+
+            product_files[product_id].append(media_path)
+
+        # Bounded so validation can't run arbitrarily far ahead holding file buffers in memory
+        ready = queue.Queue(maxsize=max_workers * 2)
+
+        def record_error(media_path: Path, e: Exception) -> None:
+            error_msg = f"Error processing {media_path.name}: {e}"
+            logger.error(error_msg)
+            with results_lock:
+                results['errors'].append(error_msg)
+                results['failed_uploads'] += 1
 
-                # Extract product ID from filename
-                product_id = self.extract_product_id_from_filename(media_path.name)
-                if not product_id:
-                    results['skipped_files'] += 1
+        def validate(product_id: str, paths: List[Path]) -> None:
+            validated = []
+            for media_path in paths:
+                try:
+                    logger.info("Processing: %s", media_path.name)
+                    data = _read_media_buffer(media_path)
+                    valid = is_valid_media(media_path, data)
+                except Exception as e:
+                    record_error(media_path, e)
                     continue
 
-                # Validate media file
-                if not is_valid_media(media_path):
-                    results['skipped_files'] += 1
+                with results_lock:
+                    if not valid:
+                        results['skipped_files'] += 1
+                        continue
+                    results['valid_images'] += 1
+                validated.append((media_path, data))
+
+            if validated:
+                ready.put((product_id, validated))
+
+        def upload() -> None:
+            while True:
+                item = ready.get()
+                if item is None:
+                    return
+
+                product_id, validated = item
+                try:
+                    if dry_run:
+                        for media_path, _ in validated:
+                            media_type = _classify(media_path)
+                            logger.info("DRY RUN: Would upload %s %s to product %s",
+                                        media_type, media_path.name, product_id)
+                        outcomes = [True] * len(validated)
+                    else:
+                        # Already verified in the validation stage
+                        outcomes = self.upload_media_batch_to_product(product_id, validated)
+                except Exception as e:
+                    for media_path, _ in validated:
+                        record_error(media_path, e)
                     continue
 
-                results['valid_images'] += 1
+                with results_lock:
+                    for success in outcomes:
+                        results['successful_uploads' if success else 'failed_uploads'] += 1
 
-                # Determine media type
-                media_type = "video" if media_path.suffix.lower() in SUPPORTED_VIDEO_FORMATS else "image"
+        # Uploads are network-bound, so overlap them on a thread pool; the shared
+        # rate limiter keeps the combined request rate under Shopify's limit
+        with ThreadPoolExecutor(max_workers=max_workers) as uploaders:
+            for _ in range(max_workers):
+                uploaders.submit(upload)
 
-                if dry_run:
-                    logger.info(f"DRY RUN: Would upload {media_type} {media_path.name} to product {product_id}")
-                    results['successful_uploads'] += 1
-                else:
-                    # Upload media to Shopify
-                    if self.upload_media_to_product(product_id, media_path):
-                        results['successful_uploads'] += 1
-                    else:
-                        results['failed_uploads'] += 1
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as validators:
+                for product_id, paths in product_files.items():
+                    validators.submit(validate, product_id, paths)
 
-            except Exception as e:
-                error_msg = f"Error processing {media_path.name}: {e}"
-                logger.error(error_msg)
-                results['errors'].append(error_msg)
-                results['failed_uploads'] += 1
+            # Validation is done; tell each upload thread to stop once the queue drains
+            for _ in range(max_workers):
+                ready.put(None)
 
         return results
 
+    async def aprocess_folder(self, folder_path: Path, dry_run: bool = False,
+                              max_in_flight: int = MAX_IN_FLIGHT) -> Dict[str, Any]:
+        """
+        Async variant of process_folder
+
+        Args:
+            folder_path: Path to the folder containing media files
+            dry_run: If True, only simulate the process without uploading
+            max_in_flight: Maximum number of products being validated or uploaded at once
+
+        Returns:
+            Dictionary with processing results
+        """
+        if not folder_path.exists() or not folder_path.is_dir():
+            results = _empty_results()
+            error_msg = f"Folder does not exist or is not a directory: {folder_path}"
+            logger.error(error_msg)
+            results['errors'].append(error_msg)
+            return results
+
+        media_files = await asyncio.to_thread(scan_media_files, folder_path)
+        logger.info("Found %s media files in %s", len(media_files), folder_path)
+
+        return await self.aprocess_entries(media_files, dry_run=dry_run, max_in_flight=max_in_flight)
+
+    async def aprocess_entries(self, media_files: List[Path], dry_run: bool = False,
+                               max_in_flight: int = MAX_IN_FLIGHT) -> Dict[str, Any]:
+        """
+        Async variant of process_entries: submit every product's files, then reap the outcomes
+
+        Files are grouped by product so each product's images go up as one batch. The
+        Shopify and GraphQL clients are synchronous, so those steps run on a worker
+        thread, while video bodies stream to storage on the event loop; the semaphore
+        bounds how many products are in flight.
+
+        Args:
+            media_files: Paths to the media files, e.g. from scan_media_files
+            dry_run: If True, only simulate the process without uploading
+            max_in_flight: Maximum number of products being validated or uploaded at once
+
+        Returns:
+            Dictionary with processing results
+        """
+        results = _empty_results()
+        results['total_files'] = len(media_files)
+
+        # Resolve every SKU up front with a few OR'd queries instead of one lookup per file
+        file_skus = {media_path: extract_sku_from_filename(media_path.name) for media_path in media_files}
+        sku_to_product_id = await asyncio.to_thread(
+            self.bulk_resolve_skus, [sku for sku in file_skus.values() if sku]
+        )
+        if not dry_run:
+            await asyncio.to_thread(self._prefetch_products, sku_to_product_id.values())
+
+        product_files = defaultdict(list)
+        for media_path in media_files:
+            product_id = sku_to_product_id.get(file_skus[media_path])
+            if not product_id:
+                logger.warning("No product found for %s", media_path.name)
+                results['skipped_files'] += 1
+                continue
+            product_files[product_id].append(media_path)
+
+        semaphore = asyncio.Semaphore(max_in_flight)
+        client = httpx.AsyncClient(limits=httpx.Limits(max_connections=MAX_ASYNC_CONNECTIONS))
+
+        async def validate_one(media_path: Path) -> Optional[Tuple[Path, Optional[bytes]]]:
+            logger.info("Processing: %s", media_path.name)
+            data = await asyncio.to_thread(_read_media_buffer, media_path)
+            if not await asyncio.to_thread(is_valid_media, media_path, data):
+                return None
+            return media_path, data
+
+        async def process_product(product_id: str, paths: List[Path]) -> List[Any]:
+            async with semaphore:
+                checked = await asyncio.gather(*(validate_one(media_path) for media_path in paths),
+                                               return_exceptions=True)
+                outcomes = dict(zip(paths, checked))
+                validated = [item for item in checked if item and not isinstance(item, Exception)]
+                if not validated:
+                    return [outcomes[media_path] for media_path in paths]
+
+                if dry_run:
+                    for media_path, _ in validated:
+                        media_type = _classify(media_path)
+                        logger.info("DRY RUN: Would upload %s %s to product %s",
+                                    media_type, media_path.name, product_id)
+                        outcomes[media_path] = True
+                    return [outcomes[media_path] for media_path in paths]
+
+                if not await asyncio.to_thread(self.get_product, product_id):
+                    for media_path, _ in validated:
+                        outcomes[media_path] = False
+                    return [outcomes[media_path] for media_path in paths]
+
+                # Videos stream on the event loop; everything else goes up as one staged batch
+                streamed = [media_path for media_path, _ in validated
+                            if self.use_staged_uploads and _classify(media_path) == 'video']
+                batched = [(media_path, data) for media_path, data in validated if media_path not in streamed]
+
+                # Already verified above
+                uploads = [self._aupload_video(client, product_id, media_path) for media_path in streamed]
+                if batched:
+                    uploads.append(asyncio.to_thread(self.upload_media_batch_to_product, product_id, batched))
+                done = await asyncio.gather(*uploads, return_exceptions=True)
+
+                for media_path, outcome in zip(streamed, done):
+                    outcomes[media_path] = outcome
+                if batched:
+                    batch_outcome = done[-1]
+                    for index, (media_path, _) in enumerate(batched):
+                        outcomes[media_path] = (batch_outcome if isinstance(batch_outcome, Exception)
+                                                else batch_outcome[index])
+                return [outcomes[media_path] for media_path in paths]
+
+        async with client:
+            grouped = await asyncio.gather(
+                *(process_product(product_id, paths) for product_id, paths in product_files.items()),
+                return_exceptions=True
+            )
+
+        for paths, group in zip(product_files.values(), grouped):
+            # A failure outside the per-file steps applies to the whole product
+            file_outcomes = [group] * len(paths) if isinstance(group, Exception) else group
+            for media_path, outcome in zip(paths, file_outcomes):
+                if isinstance(outcome, Exception):
+                    error_msg = f"Error processing {media_path.name}: {outcome}"
+                    logger.error(error_msg)
+                    results['errors'].append(error_msg)
+                    results['failed_uploads'] += 1
+                elif outcome is None:
+                    results['skipped_files'] += 1
+                else:
+                    results['valid_images'] += 1
+                    results['successful_uploads' if outcome else 'failed_uploads'] += 1
+
+        return results
 
 def main():
     """Main function"""
@@ -421,6 +1691,26 @@ Supported formats:
         help='Simulate the process without actually uploading media files'
     )
 
+    parser.add_argument(
+        '--workers', '--concurrency',
+        dest='workers',
+        type=int,
+        help=f'Number of products uploaded concurrently (default: {MAX_UPLOAD_WORKERS}, '
+             f'or {MAX_IN_FLIGHT} with --asyncio)'
+    )
+
+    parser.add_argument(
+        '--legacy',
+        action='store_true',
+        help='Upload images base64-encoded through the REST Image endpoint instead of staged uploads'
+    )
+
+    parser.add_argument(
+        '--asyncio',
+        action='store_true',
+        help='Use the asyncio pipeline, with --workers products in flight, instead of the thread pool'
+    )
+
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -428,6 +1718,8 @@ Supported formats:
     )
 
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
 
     # Set logging level
     if args.verbose:
@@ -437,9 +1729,10 @@ Supported formats:
 
     # Initialize uploader
     try:
-        uploader = ShopifyImageUploader(SHOPIFY_STORE_URL, ADMIN_API_ACCESS_TOKEN)
+        uploader = ShopifyImageUploader(SHOPIFY_STORE_URL, ADMIN_API_ACCESS_TOKEN,
+                                        use_staged_uploads=not args.legacy)
     except Exception as e:
-        logger.error(f"Failed to initialize Shopify connection: {e}")
+        logger.error("Failed to initialize Shopify connection: %s", e)
         sys.exit(1)
 
     # Process folder
@@ -448,7 +1741,15 @@ Supported formats:
     if args.dry_run:
         logger.info("DRY RUN MODE - No media files will be uploaded")
 
-    results = uploader.process_folder(folder_path, dry_run=args.dry_run)
+    try:
+        if args.asyncio:
+            results = asyncio.run(uploader.aprocess_folder(folder_path, dry_run=args.dry_run,
+                                                           max_in_flight=args.workers or MAX_IN_FLIGHT))
+        else:
+            results = uploader.process_folder(folder_path, dry_run=args.dry_run,
+                                              max_workers=args.workers or MAX_UPLOAD_WORKERS)
+    finally:
+        uploader.close()
 
     # Print results
     print("\n" + "="*50)
@@ -18,41 +18,242 @@ Output CSV format:
 """
 
 import argparse
+import asyncio
+import csv
+import hashlib
+import io
+import json
 import logging
+import math
+import os
 import re
+import string
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
-from urllib.parse import urlparse, parse_qs
+from typing import Dict, List, Optional, Set, TextIO, Tuple
 
-import gdown
+import httpx
 import pandas as pd
 from google import genai
 from google.genai import types
+from PIL import Image
+from pydantic import BaseModel, TypeAdapter
 
 # Try to import from src directory, fallback to current directory
 try:
+    from src.clients import gemini_client
     from src.config import GEMINI_API_KEY, GEMINI_MODEL
 except ImportError:
     # If running from root directory
-    import sys
-
     sys.path.append('')
+    from clients import gemini_client
     from config import GEMINI_API_KEY, GEMINI_MODEL
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Number of input rows read into memory at a time; small enough that work starts soon after the file opens
+DEFAULT_CHUNK_SIZE = 1000
+
+# Input columns the processor reads; anything else in the sheet is never parsed
+INPUT_COLUMNS = frozenset({'Image URL', 'SKU', 'Selling Price', 'MRP', 'Quantity', 'Buy Price'})
+
+# Read identifiers as text so SKUs like "00123" keep their leading zeros
+INPUT_DTYPES = {'Image URL': str, 'SKU': str}
+
+# Rows processed concurrently; each spends most of its time waiting on Drive and Gemini
+DEFAULT_WORKERS = 16
+
+# Instructions sent with every image; the per-row SKU and price follow them
+ANALYSIS_INSTRUCTIONS = """
+            Analyze this jewelry image and provide the following information in a structured format:
+
+            1. TITLE: Generate a 4-5 word catchy product title that would appeal to customers
+            2. DESCRIPTION: Write a 5-6 line SEO-friendly product description in a luxury tone that highlights the jewelry's features, materials, and appeal
+            3. CATEGORY: Identify the jewelry category (e.g., Necklace, Earrings, Ring, Bracelet, Pendant, Chain, etc.)
+            4. TAGS: Generate 8-10 relevant one word tags separated by commas (include style, material, occasion, color, etc.)
+
+            Return the title, description, category and tags as the fields of the JSON response.
+"""
+
+# Longest side of the image sent for analysis; larger photos are downscaled before upload
+MAX_ANALYSIS_IMAGE_SIDE = 1024
+
+# JPEG quality used when re-encoding a downscaled analysis image
+ANALYSIS_JPEG_QUALITY = 85
+
+# Downloaded images are always saved as .jpg and downscaled ones re-encoded as JPEG
+ANALYSIS_MIME_TYPE = 'image/jpeg'
+
+# Gemini only caches prompt prefixes of at least this many tokens
+MIN_CACHED_CONTENT_TOKENS = 2048
+
+# Rough characters per token, used to rule out caching locally before asking Gemini for a count
+CHARS_PER_TOKEN_ESTIMATE = 4
+
+# How long an explicit context cache of the instructions is kept
+INSTRUCTIONS_CACHE_TTL = "3600s"
+
+# Default directory for Drive images kept between runs, named by Drive file ID
+DEFAULT_IMAGE_CACHE_DIR = Path(".drive_cache")
+
+# Image downloads in flight at once, all sharing one connection pool
+MAX_CONCURRENT_DOWNLOADS = 50
+
+# Size of each piece of a download written to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Direct download endpoint for Google Drive files
+DRIVE_DOWNLOAD_URL = "https://drive.google.com/uc"
+
+# File ID in any of the Google Drive URL forms the sheets use
+_DRIVE_ID_RE = re.compile(r'(?:/file/d/|[?&]id=)([A-Za-z0-9_-]+)')
+
+# Drive answers large files with a virus-scan warning page whose form carries the confirm token
+_DRIVE_FORM_ACTION_RE = re.compile(r'<form[^>]*id="download-form"[^>]*action="([^"]+)"')
+_DRIVE_HIDDEN_INPUT_RE = re.compile(r'<input type="hidden" name="([^"]+)" value="([^"]*)"')
+_DRIVE_CONFIRM_RE = re.compile(r'confirm=([0-9A-Za-z_-]+)')
+
+# Collapses the runs of hyphens left after translating a handle
+_MULTI_HYPHEN_RE = re.compile(r'-+')
+
+# Buffer size for CSV file I/O, large enough to keep read/write syscalls rare
+CSV_BUFFER_SIZE = 1 << 20
+
+
+class JewelryInfo(BaseModel):
+    """Structured product information Gemini returns for one jewelry image"""
+
+    title: str
+    description: str
+    category: str
+    tags: List[str]
+
+
+# Have Gemini answer with JSON matching JewelryInfo instead of free-form text
+ANALYSIS_RESPONSE_CONFIG = {'response_mime_type': 'application/json', 'response_schema': JewelryInfo}
+
+
+class BatchJewelryInfo(JewelryInfo):
+    """JewelryInfo for one image of a batched request, naming the image and SKU it describes"""
+
+    image: int
+    sku: str
+
+
+# Same, for a request carrying several images that is answered with one entry per image
+BATCH_ANALYSIS_RESPONSE_CONFIG = {'response_mime_type': 'application/json', 'response_schema': List[BatchJewelryInfo]}
+_BATCH_JEWELRY_INFO_LIST = TypeAdapter(List[BatchJewelryInfo])
+
+# Images analyzed per Gemini request; 1 sends every image on its own
+DEFAULT_ANALYSIS_BATCH_SIZE = 4
+
+
+class _HandleCharMap(dict):
+    """str.translate table for handles: keeps [a-z0-9-], turns whitespace into '-', drops everything else"""
+
+    _KEEP = frozenset(string.ascii_lowercase + string.digits + '-')
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        if char in self._KEEP:
+            value = codepoint
+        elif char.isspace():
+            value = ord('-')
+        else:
+            value = None
+        self[codepoint] = value
+        return value
+
+
+_HANDLE_CHARS = _HandleCharMap()
+
+
+class GeminiResponseCache:
+    """On-disk cache of parsed Gemini responses, keyed by model, prompt and image content"""
+
+    def __init__(self, cache_dir: Path = Path(".gemini_cache"), ttl_seconds: float = 30 * 24 * 60 * 60):
+        """Initialize the cache directory, the in-memory tier and hit/miss counters"""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Entries seen this run, so repeated images skip the file read and JSON parse
+        self._memory: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    def make_key(model: str, prompt: str, image_data: bytes) -> str:
+        """Build a cache key from the request inputs"""
+        image_hash = hashlib.sha256(image_data).hexdigest()
+        return hashlib.sha256(f"{model}\n{prompt}\n{image_hash}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Return the cached result for a key, or None if missing or expired"""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self.hits += 1
+                return result
+
+        try:
+            entry = json.loads((self.cache_dir / f"{key}.json").read_text(encoding='utf-8'))
+            if time.time() - entry['created_at'] <= self.ttl_seconds:
+                with self._lock:
+                    self._memory[key] = entry['result']
+                    self.hits += 1
+                return entry['result']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, result: Dict[str, str]) -> None:
+        """Store a result, writing to a temporary file first so readers never see partial JSON"""
+        with self._lock:
+            self._memory[key] = result
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({'created_at': time.time(), 'result': result}), encoding='utf-8')
+        os.replace(tmp_path, path)
+
 
 class JewelryCSVProcessor:
     """Process jewelry CSV files and generate Shopify-compatible output"""
 
-    def __init__(self, gemini_api_key: str):
-        """Initialize the processor with Gemini API key"""
+    def __init__(self, gemini_api_key: str, response_cache: Optional[GeminiResponseCache] = None,
+                 client: Optional[genai.Client] = None, image_cache_dir: Optional[Path] = None):
+        """
+        Initialize the processor with Gemini API key, an optional response cache and an optional shared client
+
+        With image_cache_dir set, downloaded images are kept there by Drive file ID and reused by
+        later runs; otherwise each image is deleted once its row is processed.
+        """
         self.gemini_api_key = gemini_api_key
-        self.client = genai.Client(api_key=gemini_api_key)
+        if client is None:
+            # The configured key gets the process-wide client, so every processor shares one connection pool
+            client = gemini_client() if gemini_api_key == GEMINI_API_KEY else genai.Client(api_key=gemini_api_key)
+        self.client = client
+        self.response_cache = response_cache
+        # Name of the explicit context cache holding ANALYSIS_INSTRUCTIONS; False once known to be unusable
+        self._instructions_cache = None
+        self._instructions_cache_lock = threading.Lock()
         self.temp_images_dir = Path("temp_images")
         self.temp_images_dir.mkdir(exist_ok=True)
+        # Downloads run on one long-lived event loop so the Drive connection pool outlives each chunk
+        self._download_loop = None
+        self._download_client = None
+        self._download_lock = threading.Lock()
+        self.image_cache_dir = Path(image_cache_dir) if image_cache_dir is not None else None
+        if self.image_cache_dir is not None:
+            self.image_cache_dir.mkdir(parents=True, exist_ok=True)
 
         # Shopify CSV headers
         self.shopify_headers = [
@@ -76,56 +277,227 @@ class JewelryCSVProcessor:
 
     def extract_google_drive_id(self, url: str) -> Optional[str]:
         """Extract file ID from Google Drive URL"""
-        try:
-            # Handle different Google Drive URL formats
-            if 'drive.google.com' in url:
-                if '/open?id=' in url:
-                    return url.split('/open?id=')[1].split('&')[0]
-                elif '/file/d/' in url:
-                    return url.split('/file/d/')[1].split('/')[0]
-                elif 'id=' in url:
-                    parsed = urlparse(url)
-                    query_params = parse_qs(parsed.query)
-                    return query_params.get('id', [None])[0]
-            return None
-        except Exception as e:
-            logger.error(f"Error extracting Google Drive ID from {url}: {e}")
+        # Handles /open?id=, /file/d/<id>/ and any other ?id= / &id= query form
+        if 'drive.google.com' not in url:
             return None
+        match = _DRIVE_ID_RE.search(url)
+        return match.group(1) if match else None
 
     def download_image(self, drive_url: str, sku: str) -> Optional[Path]:
         """Download image from Google Drive URL"""
-        try:
-            file_id = self.extract_google_drive_id(drive_url)
-            if not file_id:
-                logger.error(f"Could not extract file ID from URL: {drive_url}")
-                return None
-
-            # Create download URL
-            download_url = f"https://drive.google.com/uc?id={file_id}"
-
-            # Create filename based on SKU
-            image_path = self.temp_images_dir / f"{sku}.jpg"
-
-            # Download the file
-            logger.info(f"Downloading image for SKU {sku}...")
-            gdown.download(download_url, str(image_path), quiet=True)
+        file_id = self.extract_google_drive_id(drive_url)
+        if not file_id:
+            logger.error(f"Could not extract file ID from URL: {drive_url}")
+            return None
+        return self.prefetch_images({file_id: sku}).get(file_id)
 
+    def row_drive_file_id(self, row: Dict) -> Optional[str]:
+        """Return the Drive file ID of a row's Image URL, or None if it has none"""
+        image_url = row.get('Image URL')
+        if not isinstance(image_url, str):
+            return None
+        return self.extract_google_drive_id(image_url.strip())
+
+    def prefetch_images(self, drive_files: Dict[str, str]) -> Dict[str, Optional[Path]]:
+        """
+        Download many {file_id: sku} Drive images concurrently, returning each file ID's path or None on failure
+
+        Images are keyed by Drive file ID rather than SKU, since rows sharing a SKU may still
+        point at different photos.
+        """
+        if not drive_files:
+            return {}
+        with self._download_lock:
+            if self._download_loop is None:
+                self._download_loop = asyncio.new_event_loop()
+            return self._download_loop.run_until_complete(self._download_all(drive_files))
+
+    async def _download_all(self, drive_files: Dict[str, str]) -> Dict[str, Optional[Path]]:
+        """Download every {file_id: sku} image over one shared keep-alive connection pool"""
+        if self._download_client is None:
+            limits = httpx.Limits(max_connections=MAX_CONCURRENT_DOWNLOADS)
+            self._download_client = httpx.AsyncClient(http2=True, follow_redirects=True, timeout=60, limits=limits)
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        paths = await asyncio.gather(*(
+            self._download_one(self._download_client, semaphore, file_id, sku)
+            for file_id, sku in drive_files.items()
+        ))
+        return dict(zip(drive_files, paths))
+
+    @staticmethod
+    def _parse_drive_confirm_page(page: str, url: str, params: Dict[str, str]):
+        """Return the (url, params) that confirm a Drive virus-scan warning page, or (None, None)"""
+        action = _DRIVE_FORM_ACTION_RE.search(page)
+        if action:
+            return action.group(1).replace('&amp;', '&'), dict(_DRIVE_HIDDEN_INPUT_RE.findall(page))
+        token = _DRIVE_CONFIRM_RE.search(page)
+        if token:
+            return url, {**params, 'confirm': token.group(1)}
+        return None, None
+
+    async def _download_one(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                            file_id: str, sku: str) -> Optional[Path]:
+        """Stream one image from Google Drive to the image cache, or the temp directory without one"""
+        if self.image_cache_dir is not None:
+            # Named by Drive file ID, so reruns and SKUs sharing a photo reuse one download
+            image_path = self.image_cache_dir / f"{file_id}.jpg"
             if image_path.exists() and image_path.stat().st_size > 0:
-                logger.info(f"Successfully downloaded image for SKU {sku}")
+                logger.info(f"Using cached image for SKU {sku}")
                 return image_path
-            else:
-                logger.error(f"Failed to download image for SKU {sku}")
-                return None
+        else:
+            # Named by file ID too, since rows sharing a SKU may use different photos
+            image_path = self.temp_images_dir / f"{file_id}.jpg"
+
+        # Written under a per-SKU temporary name and moved into place when complete, so a
+        # partial download is never mistaken for a cached one
+        tmp_path = image_path.with_name(f"{image_path.name}.{sku}.tmp")
+        url, params = DRIVE_DOWNLOAD_URL, {'export': 'download', 'id': file_id}
+
+        try:
+            async with semaphore:
+                logger.info(f"Downloading image for SKU {sku}...")
+                # At most one warning page is expected before the file itself
+                for _ in range(2):
+                    async with client.stream('GET', url, params=params) as response:
+                        response.raise_for_status()
+                        if not response.headers.get('content-type', '').startswith('text/html'):
+                            with open(tmp_path, 'wb') as f:
+                                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                                    f.write(chunk)
+                            os.replace(tmp_path, image_path)
+                            break
+                        page = (await response.aread()).decode('utf-8', errors='replace')
+
+                    url, params = self._parse_drive_confirm_page(page, url, params)
+                    if url is None:
+                        break
 
         except Exception as e:
             logger.error(f"Error downloading image for SKU {sku}: {e}")
+            tmp_path.unlink(missing_ok=True)
             return None
 
-    def get_mime_type(self, file_path: Path) -> str:
-        """Get MIME type for image file"""
-        import mimetypes
-        mime_type, _ = mimetypes.guess_type(str(file_path))
-        return mime_type or 'image/jpeg'
+        if image_path.exists() and image_path.stat().st_size > 0:
+            logger.info(f"Successfully downloaded image for SKU {sku}")
+            return image_path
+        logger.error(f"Failed to download image for SKU {sku}")
+        return None
+
+    def _prepare_image(self, image_path: Path, image_data: bytes):
+        """
+        Return (bytes, mime type) of the image to send to Gemini, downscaled to MAX_ANALYSIS_IMAGE_SIDE
+
+        Catalog photos are often several times larger than Gemini looks at, so shrinking them
+        first cuts upload time and vision tokens. Images that are already small enough, or
+        that Pillow cannot read, are sent unchanged.
+        """
+        try:
+            with Image.open(io.BytesIO(image_data)) as image:
+                if max(image.size) <= MAX_ANALYSIS_IMAGE_SIDE:
+                    return image_data, ANALYSIS_MIME_TYPE
+                # Lets the JPEG decoder skip straight to a reduced scale
+                image.draft('RGB', (MAX_ANALYSIS_IMAGE_SIDE, MAX_ANALYSIS_IMAGE_SIDE))
+                image.thumbnail((MAX_ANALYSIS_IMAGE_SIDE, MAX_ANALYSIS_IMAGE_SIDE), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                image.convert('RGB').save(buffer, format='JPEG', quality=ANALYSIS_JPEG_QUALITY, optimize=True)
+                return buffer.getvalue(), ANALYSIS_MIME_TYPE
+        except Exception as e:
+            logger.warning(f"Could not downscale {image_path}, sending it unchanged: {e}")
+            return image_data, ANALYSIS_MIME_TYPE
+
+    def _get_instructions_cache(self) -> Optional[str]:
+        """
+        Return the name of a Gemini context cache holding ANALYSIS_INSTRUCTIONS, creating it on first use
+
+        Gemini only caches prefixes above a minimum token count, so no cache is created while the
+        instructions are shorter than that; padding them up would cost more than resending them.
+        """
+        # Instructions far below the minimum never need the count_tokens round trip, nor the lock
+        if len(ANALYSIS_INSTRUCTIONS) // CHARS_PER_TOKEN_ESTIMATE < MIN_CACHED_CONTENT_TOKENS:
+            return None
+
+        with self._instructions_cache_lock:
+            if self._instructions_cache is None:
+                self._instructions_cache = False
+                try:
+                    token_count = self.client.models.count_tokens(
+                        model=GEMINI_MODEL, contents=ANALYSIS_INSTRUCTIONS
+                    ).total_tokens
+                    if token_count >= MIN_CACHED_CONTENT_TOKENS:
+                        cache = self.client.caches.create(
+                            model=GEMINI_MODEL,
+                            config=types.CreateCachedContentConfig(
+                                system_instruction=ANALYSIS_INSTRUCTIONS, ttl=INSTRUCTIONS_CACHE_TTL
+                            )
+                        )
+                        self._instructions_cache = cache.name
+                        logger.info(f"Cached {token_count} instruction tokens as {cache.name}")
+                    else:
+                        logger.info(f"Instructions are {token_count} tokens, below Gemini's context cache minimum")
+                except Exception as e:
+                    logger.warning(f"Could not create Gemini context cache, sending instructions inline: {e}")
+            return self._instructions_cache or None
+
+    def _generate_analysis(self, image_parts: List[types.Part], item_details: str,
+                           response_config: Dict):
+        """Send images plus per-item details to Gemini, using the instructions cache when one exists"""
+        # With the instructions in a context cache, only the images and the per-item details are sent
+        instructions_cache = self._get_instructions_cache()
+        if instructions_cache:
+            try:
+                return self.client.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=[*image_parts, genai.types.Part.from_text(text=item_details)],
+                    config=types.GenerateContentConfig(cached_content=instructions_cache, **response_config)
+                )
+            except Exception as e:
+                # Most likely the cache expired; recreate it on the next call
+                logger.warning(f"Gemini context cache {instructions_cache} unusable, sending instructions inline: {e}")
+                with self._instructions_cache_lock:
+                    if self._instructions_cache == instructions_cache:
+                        self._instructions_cache = None
+
+        # Prepare content for Gemini
+        contents = [
+            *image_parts,
+            genai.types.Part.from_text(text=ANALYSIS_INSTRUCTIONS + item_details)
+        ]
+
+        # Generate content
+        return self.client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=contents,
+            config=types.GenerateContentConfig(**response_config)
+        )
+
+    @staticmethod
+    def _product_info(info: JewelryInfo) -> Dict[str, str]:
+        """Flatten a JewelryInfo into the string fields the Shopify rows use"""
+        return {
+            'title': info.title.strip(),
+            'description': ' '.join(info.description.split()),
+            'category': info.category.strip(),
+            'tags': ', '.join(tag.strip() for tag in info.tags)
+        }
+
+    def _read_for_analysis(self, image_path: Path) -> Tuple[bytes, Optional[str], Optional[Dict[str, str]]]:
+        """Read an image and look it up in the response cache, returning (bytes, cache key, cached result)"""
+        # Read image data
+        image_data = Path(image_path).read_bytes()
+
+        # Reuse a previous analysis of the same image if we have one; the key leaves out the
+        # per-row SKU and price so variants sharing a photo cost a single Gemini call
+        if self.response_cache is None:
+            return image_data, None, None
+        cache_key = self.response_cache.make_key(GEMINI_MODEL, ANALYSIS_INSTRUCTIONS, image_data)
+        return image_data, cache_key, self.response_cache.get(cache_key)
+
+    def _image_part(self, image_path: Path, image_data: bytes) -> types.Part:
+        """Build the inline image part sent to Gemini"""
+        # The cache key uses the original bytes; only the copy sent to Gemini is downscaled
+        upload_data, mime_type = self._prepare_image(image_path, image_data)
+        return types.Part(inline_data=types.Blob(data=upload_data, mime_type=mime_type))
 
     def analyze_jewelry_with_gemini(self, image_path: Path, sku: str, price: float) -> Dict[str, str]:
         """Use Gemini to analyze jewelry image and extract product information"""
@@ -133,102 +505,99 @@ class JewelryCSVProcessor:
             logger.info(f"Analyzing jewelry image for SKU {sku} with Gemini...")
 
             # Prepare the prompt
-            prompt = f"""
-            Analyze this jewelry image and provide the following information in a structured format:
-
-            1. TITLE: Generate a 4-5 word catchy product title that would appeal to customers
-            2. DESCRIPTION: Write a 5-6 line SEO-friendly product description in a luxury tone that highlights the jewelry's features, materials, and appeal
-            3. CATEGORY: Identify the jewelry category (e.g., Necklace, Earrings, Ring, Bracelet, Pendant, Chain, etc.)
-            4. TAGS: Generate 8-10 relevant one word tags separated by commas (include style, material, occasion, color, etc.)
-
-            Please format your response exactly like this:
-            TITLE: [your title here]
-            DESCRIPTION: [your description here]
-            CATEGORY: [category here]
-            TAGS: [tag1, tag2, tag3, etc.]
-
+            item_details = f"""
             The jewelry item has SKU: {sku} and price: ${price:.2f}
             """
 
-            # Read image data
-            with open(image_path, "rb") as f:
-                image_data = f.read()
-
-            mime_type = self.get_mime_type(image_path)
+            image_data, cache_key, cached = self._read_for_analysis(image_path)
+            if cached:
+                logger.info(f"Using cached Gemini analysis for SKU {sku}")
+                return cached
 
-            # Prepare content for Gemini
-            contents = [
-                types.Part(inline_data=types.Blob(data=image_data, mime_type=mime_type)),
-                genai.types.Part.from_text(text=prompt)
-            ]
-
-            # Generate content
-            response = self.client.models.generate_content(
-                model=GEMINI_MODEL,
-                contents=contents
-            )
-
-            # Parse response
-            response_text = response.text
-            logger.info(f"Gemini response for SKU {sku}: {response_text[:200]}...")
-
-            return self.parse_gemini_response(response_text)
-
-        except Exception as e:
-            logger.error(f"Error analyzing image with Gemini for SKU {sku}: {e}")
-            raise e
-
-    def parse_gemini_response(self, response_text: str) -> Dict[str, str]:
-        """Parse Gemini response to extract structured information"""
-        try:
-            result = {
-                'title': '',
-                'description': '',
-                'category': '',
-                'tags': ''
-            }
-
-            lines = response_text.strip().split('\n')
-            current_field = None
-
-            for line in lines:
-                line = line.strip()
-                if line.startswith('TITLE:'):
-                    result['title'] = line.replace('TITLE:', '').strip()
-                elif line.startswith('DESCRIPTION:'):
-                    result['description'] = line.replace('DESCRIPTION:', '').strip()
-                    current_field = 'description'
-                elif line.startswith('CATEGORY:'):
-                    result['category'] = line.replace('CATEGORY:', '').strip()
-                    current_field = None
-                elif line.startswith('TAGS:'):
-                    result['tags'] = line.replace('TAGS:', '').strip()
-                    current_field = None
-                elif current_field == 'description' and line and not line.startswith(('CATEGORY:', 'TAGS:')):
-                    # Continue description on next lines
-                    result['description'] += ' ' + line
-
-            # Clean up description
-            result['description'] = ' '.join(result['description'].split())
+            response = self._generate_analysis([self._image_part(image_path, image_data)], item_details,
+                                               ANALYSIS_RESPONSE_CONFIG)
+            logger.info(f"Gemini response for SKU {sku}: {response.text[:200]}...")
 
+            # The SDK validates the JSON against the schema; parse the text only if it could not
+            info = response.parsed or JewelryInfo.model_validate_json(response.text)
+            result = self._product_info(info)
+            if cache_key:
+                self.response_cache.set(cache_key, result)
             return result
 
         except Exception as e:
-            logger.error(f"Error parsing Gemini response: {e}")
+            logger.error(f"Error analyzing image with Gemini for SKU {sku}: {e}")
             raise e
 
+    def analyze_jewelry_batch(self, items: List[Tuple[Path, str, float]]) -> List[Dict[str, str]]:
+        """
+        Analyze several (image path, SKU, price) items, sending every uncached image in one Gemini request
+
+        Every entry Gemini returns names the image number and SKU it describes, and is matched
+        on those rather than on its position. Raises, caching nothing, unless there is exactly
+        one matching entry per image sent.
+        """
+        results = [None] * len(items)
+        pending = []
+        for position, (image_path, sku, price) in enumerate(items):
+            image_data, cache_key, cached = self._read_for_analysis(image_path)
+            if cached:
+                logger.info(f"Using cached Gemini analysis for SKU {sku}")
+                results[position] = cached
+            else:
+                pending.append((position, image_path, sku, price, image_data, cache_key))
+
+        if not pending:
+            return results
+
+        skus = ', '.join(sku for _, _, sku, _, _, _ in pending)
+        logger.info(f"Analyzing {len(pending)} jewelry images for SKUs {skus} with Gemini...")
+        item_details = f"""
+            There are {len(pending)} images, each showing a different jewelry item. Answer with a JSON array
+            holding one entry per image, with "image" set to the image number and "sku" to its SKU:
+            """ + ''.join(
+            f"""
+            Image {number}: the jewelry item has SKU: {sku} and price: ${price:.2f}"""
+            for number, (_, _, sku, price, _, _) in enumerate(pending, start=1)
+        ) + "\n"
+
+        response = self._generate_analysis(
+            [self._image_part(image_path, image_data) for _, image_path, _, _, image_data, _ in pending],
+            item_details, BATCH_ANALYSIS_RESPONSE_CONFIG
+        )
+        logger.info(f"Gemini response for SKUs {skus}: {response.text[:200]}...")
+
+        infos = response.parsed or _BATCH_JEWELRY_INFO_LIST.validate_json(response.text)
+        by_image = {info.image: info for info in infos}
+        if len(infos) != len(pending) or len(by_image) != len(pending):
+            raise ValueError(f"Gemini returned {len(infos)} analyses for {len(pending)} images")
+        for number, (_, _, sku, _, _, _) in enumerate(pending, start=1):
+            info = by_image.get(number)
+            if info is None or info.sku.strip() != sku:
+                raise ValueError(f"Gemini returned no analysis matching image {number} (SKU {sku})")
+
+        for number, (position, _, _, _, _, cache_key) in enumerate(pending, start=1):
+            results[position] = self._product_info(by_image[number])
+            if cache_key:
+                self.response_cache.set(cache_key, results[position])
+        return results
 
     def create_shopify_handle(self, title: str, sku: str) -> str:
         """Create a Shopify handle from title and SKU"""
-        # Combine title and SKU, convert to lowercase, replace spaces and special chars with hyphens
-        handle = f"{title} {sku}".lower()
-        handle = re.sub(r'[^a-z0-9\s-]', '', handle)
-        handle = re.sub(r'\s+', '-', handle)
-        handle = re.sub(r'-+', '-', handle)
-        return handle.strip('-')
-
-    def process_csv_row(self, row: Dict) -> Optional[Dict]:
-        """Process a single CSV row and return Shopify-compatible data"""
+        # Combine title and SKU, convert to lowercase, then drop special chars and turn
+        # whitespace into hyphens in a single translate pass
+        handle = f"{title} {sku}".lower().translate(_HANDLE_CHARS)
+        return _MULTI_HYPHEN_RE.sub('-', handle).strip('-')
+
+    def process_csv_row(self, row: Dict, image_path: Optional[Path] = None,
+                        product_info: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """
+        Process a single CSV row and return Shopify-compatible data
+
+        If image_path is given, the row's image was already downloaded and the caller
+        owns the file; otherwise it is downloaded here and deleted afterwards. If
+        product_info is given, the image was already analyzed and Gemini is not called.
+        """
         try:
             # Extract required fields
             image_url = row.get('Image URL', '').strip()
@@ -241,14 +610,22 @@ class JewelryCSVProcessor:
                 logger.warning(f"Skipping row with missing image URL or SKU: {row}")
                 return None
 
+            # Blank prices are read as NaN rather than failing float()
+            if math.isnan(selling_price):
+                logger.warning(f"Skipping row with missing selling price for SKU {sku}")
+                return None
+
             # Download image
-            image_path = self.download_image(image_url, sku)
+            downloaded = image_path is None
+            if downloaded:
+                image_path = self.download_image(image_url, sku)
             if not image_path:
                 logger.error(f"Failed to download image for SKU {sku}")
                 return None
 
             # Analyze with Gemini
-            product_info = self.analyze_jewelry_with_gemini(image_path, sku, selling_price)
+            if product_info is None:
+                product_info = self.analyze_jewelry_with_gemini(image_path, sku, selling_price)
 
             # Create Shopify handle
             handle = self.create_shopify_handle(product_info['title'], sku)
@@ -302,16 +679,13 @@ class JewelryCSVProcessor:
                 'Variant Image': '',
                 'Variant Weight Unit': 'g',
                 'Variant Tax Code': '',
-                'Cost per item': row.get('Buy Price', ''),
+                'Cost per item': '' if pd.isna(row.get('Buy Price')) else row['Buy Price'],
                 'Status': 'active'
             }
 
             # Clean up temporary image
-            try:
-                image_path.unlink()
-            except Exception as e:
-                logger.warning(f"Failed to delete temporary image {image_path}: {e}")
-                pass
+            if downloaded:
+                self._remove_temp_image(image_path)
 
             return shopify_row
 
@@ -319,40 +693,193 @@ class JewelryCSVProcessor:
             logger.error(f"Error processing row {row}: {e}")
             raise e
 
-    def process_csv_file(self, input_file: str, output_file: str) -> None:
-        """Process the entire CSV file"""
+    def _remove_temp_image(self, image_path: Path) -> None:
+        """Delete a downloaded image, logging rather than raising on failure; cached images are kept"""
+        if self.image_cache_dir is not None and image_path.parent == self.image_cache_dir:
+            return
         try:
-            logger.info(f"Reading input CSV file: {input_file}")
-
-            # Read input CSV
-            df = pd.read_csv(input_file)
-            logger.info(f"Found {len(df)} rows in input file")
-
-            # Process each row
-            shopify_rows = []
-            for index, row in df.iterrows():
-                logger.info(f"Processing row {index + 1}/{len(df)}")
-                shopify_row = self.process_csv_row(row.to_dict())
-                if shopify_row:
-                    shopify_rows.append(shopify_row)
-                else:
-                    logger.warning(f"Skipped row {index + 1}")
-
-            # Write output CSV
-            if shopify_rows:
-                logger.info(f"Writing {len(shopify_rows)} products to output file: {output_file}")
-                output_df = pd.DataFrame(shopify_rows)
-                output_df.to_csv(output_file, index=False)
-                logger.info(f"Successfully created Shopify CSV: {output_file}")
-            else:
+            image_path.unlink()
+        except Exception as e:
+            logger.warning(f"Failed to delete temporary image {image_path}: {e}")
+
+    def load_processed_skus(self, output_file: str) -> Set[str]:
+        """Return the SKUs already written to an existing output file, so a rerun can resume"""
+        if not os.path.exists(output_file):
+            return set()
+        try:
+            processed = pd.read_csv(output_file, usecols=['Variant SKU'], dtype=str)['Variant SKU']
+        except (ValueError, pd.errors.EmptyDataError) as e:
+            logger.warning(f"Could not read processed SKUs from {output_file}: {e}")
+            return set()
+        return set(processed.dropna().str.strip())
+
+    def process_csv_file(self, input_file: str, output_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         skip_skus: Optional[Set[str]] = None, append: bool = False,
+                         max_workers: int = DEFAULT_WORKERS,
+                         analysis_batch_size: int = DEFAULT_ANALYSIS_BATCH_SIZE) -> None:
+        """Process the CSV file in chunks, appending each processed chunk to the output file"""
+        logger.info(f"Reading input CSV file: {input_file}")
+        with open(input_file, 'r', buffering=CSV_BUFFER_SIZE, newline='', encoding='utf-8') as input_stream:
+            self.process_csv_stream(input_stream, output_file, chunk_size=chunk_size, skip_skus=skip_skus,
+                                    append=append, max_workers=max_workers,
+                                    analysis_batch_size=analysis_batch_size)
+
+    def process_csv_stream(self, input_stream: TextIO, output_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                           skip_skus: Optional[Set[str]] = None, append: bool = False,
+                           max_workers: int = DEFAULT_WORKERS,
+                           analysis_batch_size: int = DEFAULT_ANALYSIS_BATCH_SIZE) -> None:
+        """
+        Process CSV data from an open text stream in chunks, appending each processed chunk to the output file
+
+        Rows whose SKU is in skip_skus are not processed. With append=True, new rows are added
+        to the end of an existing output file instead of replacing it. Up to max_workers rows of
+        a chunk are processed at once; output keeps the input row order. Images are sent to Gemini
+        analysis_batch_size at a time; rows whose batch fails are analyzed on their own.
+        """
+        skip_skus = skip_skus or set()
+        output_stream = None
+        writer = None
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        def process(item, images, product_info):
+            index, row_data = item
+            file_id = self.row_drive_file_id(row_data)
+            if file_id in images and images[file_id] is None:
+                logger.error(f"Failed to download image for SKU {str(row_data.get('SKU', '')).strip()}")
+                return None
+            logger.info(f"Processing row {index + 1}")
+            return self.process_csv_row(row_data, images.get(file_id), product_info)
+
+        def analyze(batch):
+            try:
+                return self.analyze_jewelry_batch([analysis for _, analysis in batch])
+            except Exception as e:
+                logger.warning(f"Batched analysis failed, analyzing {len(batch)} images one at a time: {e}")
+                return [None] * len(batch)
+
+        try:
+            total_rows = 0
+            written_rows = 0
+            resumed_rows = 0
+
+            # Read input CSV in chunks so memory stays bounded on large inventories
+            reader = pd.read_csv(input_stream, chunksize=chunk_size, dtype=INPUT_DTYPES,
+                                 usecols=lambda column: column in INPUT_COLUMNS)
+            for chunk_index, chunk in enumerate(reader):
+                logger.info(f"Processing chunk {chunk_index + 1} ({len(chunk)} rows)")
+                total_rows += len(chunk)
+
+                pending = []
+                for index, row_data in zip(chunk.index, chunk.to_dict(orient='records')):
+                    if str(row_data.get('SKU', '')).strip() in skip_skus:
+                        resumed_rows += 1
+                        continue
+                    pending.append((index, row_data))
+
+                # Fetch the chunk's images up front on one event loop instead of one download per row
+                drive_files = {}
+                for _, row_data in pending:
+                    sku = str(row_data.get('SKU', '')).strip()
+                    file_id = self.row_drive_file_id(row_data)
+                    if sku and file_id:
+                        drive_files.setdefault(file_id, sku)
+                images = self.prefetch_images(drive_files)
+
+                # Identical rows are processed once and the result is written for each of them
+                unique_rows = []
+                row_positions = []
+                first_seen = {}
+                for item in pending:
+                    row_key = tuple((column, str(value)) for column, value in item[1].items())
+                    if row_key not in first_seen:
+                        first_seen[row_key] = len(unique_rows)
+                        unique_rows.append(item)
+                    row_positions.append(first_seen[row_key])
+                if len(unique_rows) < len(pending):
+                    logger.info(f"Reusing results for {len(pending) - len(unique_rows)} duplicate rows")
+
+                # Analyze the chunk's images a batch per Gemini request before building the rows
+                product_infos = {}
+                if analysis_batch_size > 1:
+                    analyses = []
+                    for position, (_, row_data) in enumerate(unique_rows):
+                        image_path = images.get(self.row_drive_file_id(row_data))
+                        try:
+                            price = float(row_data.get('Selling Price', 0))
+                        except (TypeError, ValueError):
+                            continue
+                        if image_path is not None and not math.isnan(price):
+                            analyses.append((position, (image_path, str(row_data['SKU']).strip(), price)))
+                    batches = [analyses[start:start + analysis_batch_size]
+                               for start in range(0, len(analyses), analysis_batch_size)]
+                    for batch, infos in zip(batches, executor.map(analyze, batches)):
+                        for (position, _), info in zip(batch, infos):
+                            if info is not None:
+                                product_infos[position] = info
+
+                # Rows are independent and I/O-bound, so process them concurrently;
+                # map yields results in input order, keeping the output stable for --resume.
+                # Each row is written as soon as it is ready instead of collecting the chunk first
+                try:
+                    results = executor.map(
+                        lambda position: process(unique_rows[position], images, product_infos.get(position)),
+                        range(len(unique_rows))
+                    )
+                    finished = []
+                    for (index, _), position in zip(pending, row_positions):
+                        # A row's first occurrence is always the next unfinished result
+                        if position == len(finished):
+                            finished.append(next(results))
+                        shopify_row = finished[position]
+                        if not shopify_row:
+                            logger.warning(f"Skipped row {index + 1}")
+                            continue
+
+                        # Open the output file on the first write
+                        if writer is None:
+                            output_stream = open(output_file, 'a' if append else 'w', buffering=CSV_BUFFER_SIZE,
+                                                 newline='', encoding='utf-8')
+                            writer = csv.DictWriter(output_stream, fieldnames=self.shopify_headers)
+                            if not append:
+                                writer.writeheader()
+                        writer.writerow(shopify_row)
+                        written_rows += 1
+                finally:
+                    for image_path in images.values():
+                        if image_path is not None:
+                            self._remove_temp_image(image_path)
+
+                # Flush per chunk so an interrupted run keeps everything written so far
+                if output_stream is not None:
+                    output_stream.flush()
+
+            logger.info(f"Found {total_rows} rows in input file")
+            if resumed_rows:
+                logger.info(f"Skipped {resumed_rows} rows already present in {output_file}")
+            if written_rows:
+                logger.info(f"Successfully wrote {written_rows} products to Shopify CSV: {output_file}")
+            elif not resumed_rows:
                 logger.error("No valid products to write to output file")
 
         except Exception as e:
             logger.error(f"Error processing CSV file: {e}")
             raise
 
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if output_stream is not None:
+                output_stream.close()
+
     def cleanup(self):
-        """Clean up temporary files"""
+        """Close the download connection pool and clean up temporary files"""
+        with self._download_lock:
+            if self._download_loop is not None:
+                if self._download_client is not None:
+                    self._download_loop.run_until_complete(self._download_client.aclose())
+                    self._download_client = None
+                self._download_loop.close()
+                self._download_loop = None
+
         try:
             if self.temp_images_dir.exists():
                 for file in self.temp_images_dir.glob("*"):
@@ -369,22 +896,42 @@ def main():
     parser.add_argument('input_csv', help='Input CSV file path')
     parser.add_argument('output_csv', help='Output Shopify CSV file path')
     parser.add_argument('--api-key', help='Gemini API key (optional, uses config if not provided)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Number of input rows to read at a time (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of rows processed concurrently (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_ANALYSIS_BATCH_SIZE,
+                        help=f'Images analyzed per Gemini request; 1 disables batching '
+                             f'(default: {DEFAULT_ANALYSIS_BATCH_SIZE})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always download images and call Gemini instead of reusing cached results')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip SKUs already present in the output CSV and append new rows to it')
 
     args = parser.parse_args()
 
     # Get API key
     api_key = args.api_key or GEMINI_API_KEY
     if not api_key:
-        logger.error("Gemini API key not provided. Set it in config.py or use --api-key argument")
+        logger.error("Gemini API key not provided. Set the GEMINI_API_KEY environment variable or use --api-key argument")
         sys.exit(1)
 
     # Initialize processor
-    processor = JewelryCSVProcessor(api_key)
+    response_cache = None if args.no_cache else GeminiResponseCache()
+    image_cache_dir = None if args.no_cache else DEFAULT_IMAGE_CACHE_DIR
+    processor = JewelryCSVProcessor(api_key, response_cache=response_cache, image_cache_dir=image_cache_dir)
 
     try:
         # Process the CSV file
-        processor.process_csv_file(args.input_csv, args.output_csv)
+        done = processor.load_processed_skus(args.output_csv) if args.resume else set()
+        if done:
+            logger.info(f"Resuming: skipping {len(done)} already-processed rows.")
+        processor.process_csv_file(args.input_csv, args.output_csv, chunk_size=args.chunk_size,
+                                   skip_skus=done, append=bool(done), max_workers=args.workers,
+                                   analysis_batch_size=args.batch_size)
         logger.info("Processing completed successfully!")
+        if response_cache is not None:
+            logger.info(f"Gemini cache hits: {response_cache.hits}, misses: {response_cache.misses}")
 
     except Exception as e:
         logger.error(f"Processing failed: {e}")
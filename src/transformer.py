@@ -2,6 +2,9 @@ import argparse
 import mimetypes
 import os
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from google import genai
@@ -12,10 +15,14 @@ from config import (
     GEMINI_API_KEY,
 )
 
+from clients import gemini_client
 from prompts import get_prompts_by_category
 
 MODEL_NAME = "gemini-2.5-flash-image-preview"
 
+# Images generated concurrently; each call spends nearly all its time waiting on Gemini
+DEFAULT_WORKERS = 8
+
 prompt_category_to_prefix = {
     'necklace': 'nk-',
     'ring': 'rg-',
@@ -26,16 +33,28 @@ def generate_images(
         prompt_category: str,
         output_dir: str,
         number_of_images: int = 3,
+        max_workers: int = DEFAULT_WORKERS,
+        force: bool = False,
 ):
     api_key = GEMINI_API_KEY
     if not api_key:
         raise ValueError("GEMINI_API_KEY environment variable not set.")
 
-    client = genai.Client(api_key=api_key)
+    # Shared process-wide client, so every worker thread draws from one connection pool
+    client = gemini_client()
 
     file_prefix = prompt_category_to_prefix[prompt_category]
-    input_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.png') and f.lower().startswith(file_prefix)]
+    # scandir yields names with their file type from one directory scan; matching stays
+    # case-insensitive, which a Path.glob pattern would not be on Linux
+    with os.scandir(input_dir) as entries:
+        input_files = [
+            entry.name for entry in entries
+            if (name := entry.name.lower()).startswith(file_prefix) and name.endswith('.png') and entry.is_file()
+        ]
     prompts = get_prompts_by_category(prompt_category)
+    # Keyed by output file: inputs for the same SKU share output names, and running them
+    # concurrently would race on one file, so only the last input per output is kept
+    tasks = {}
     for image_name in input_files:
         for i in range(1, number_of_images + 1):
             prompt = random.choice(prompts[i-1])
@@ -47,14 +66,21 @@ def generate_images(
             final_prompt = prompt + " Also add the text " + sku + " vertically top to down to the bottom right of the generated image, the font size should be 6 and font color should be contrasting with the background."
             output_image_name = f"{sku}-0{i}.{input_image_parts[1]}"
             output_file = os.path.join(output_dir, f"{output_image_name}")
-            do_generate_image(client, sku, input_file, output_file, final_prompt)
+            # Outputs from an earlier run are kept unless regeneration is forced
+            if not force and os.path.isfile(output_file) and os.path.getsize(output_file) > 0:
+                print(f"Skipping {output_file}, already generated")
+                continue
+            tasks[output_file] = (sku, input_file, output_file, final_prompt)
+
+    # Every generation is independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda task: do_generate_image(client, *task), tasks.values()))
 
 
 def do_generate_image(client, sku, image_path, output_file, prompt):
     contents = []
     print(f"Processing {image_path}...")
-    with open(image_path, "rb") as f:
-        image_data = f.read()
+    image_data = Path(image_path).read_bytes()
     mime_type = _get_mime_type(image_path)
     contents.append(
         types.Part(inline_data=types.Blob(data=image_data, mime_type=mime_type))
@@ -74,8 +100,7 @@ def _load_image_parts(image_paths: list[str]) -> list[types.Part]:
     """Loads image files and converts them into GenAI Part objects."""
     parts = []
     for image_path in image_paths:
-        with open(image_path, "rb") as f:
-            image_data = f.read()
+        image_data = Path(image_path).read_bytes()
         mime_type = _get_mime_type(image_path)
         parts.append(
             types.Part(inline_data=types.Blob(data=image_data, mime_type=mime_type))
@@ -104,19 +129,34 @@ def _process_api_stream_response(stream, output_file: str):
 
 def _save_binary_file(file_name: str, data: bytes):
     """Saves binary data to a specified file."""
-    with open(file_name, "wb") as f:
-        f.write(data)
+    # Write to a temporary file first so an interrupted run never leaves a partial image
+    # that a rerun would mistake for a finished one; the name is unique so writers never share it
+    tmp_name = f"{file_name}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_name, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
     print(f"File saved to: {file_name}")
 
 
 def _get_mime_type(file_path: str) -> str:
     """Guesses the MIME type of a file based on its extension."""
-    mime_type, _ = mimetypes.guess_type(file_path)
+    mime_type = _mime_type_for_extension(os.path.splitext(file_path)[1].lower())
     if mime_type is None:
         raise ValueError(f"Could not determine MIME type for {file_path}")
     return mime_type
 
 
+@lru_cache(maxsize=None)
+def _mime_type_for_extension(extension: str):
+    """Looks up the MIME type for a file extension once per extension."""
+    mime_type, _ = mimetypes.guess_type(f"file{extension}")
+    return mime_type
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Remix images using Google Generative AI."
@@ -149,6 +189,18 @@ def main():
         required=True,
         help="Number of images for each input image",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of images generated concurrently (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate images even if the output file already exists",
+    )
 
     args = parser.parse_args()
 
@@ -157,6 +209,8 @@ def main():
         prompt_category=args.category,
         output_dir=args.output_dir,
         number_of_images=args.number_of_images,
+        max_workers=args.workers,
+        force=args.force,
     )
 
 